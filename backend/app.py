@@ -0,0 +1,166 @@
+"""FastAPI application for the RAG-enabled HR evaluation chat backend.
+
+Kept apart from main.py: spawned worker processes re-import the main module,
+and must not build the app, open ChromaDB or load the embedding model.
+"""
+
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from config import settings
+
+# Cap BLAS/OpenMP threads before torch is imported; uvicorn workers multiply them
+_num_threads = str(max(1, (os.cpu_count() or 1) // max(1, settings.backend_workers)))
+os.environ.setdefault("OMP_NUM_THREADS", _num_threads)
+os.environ.setdefault("MKL_NUM_THREADS", _num_threads)
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+from models import HealthResponse
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="[%(asctime)s] %(levelname)s - %(name)s - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+logger = logging.getLogger(__name__)
+
+
+async def warm_embedding_model(embedding_model) -> None:
+    """Load the embedding model and run a throwaway encode before traffic arrives."""
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.run_in_executor(None, embedding_model._load_model)
+        await loop.run_in_executor(None, embedding_model.encode, ["warmup"])
+        logger.info("Embedding model warmed up")
+    except Exception as e:
+        # Defer to lazy loading on the first request
+        logger.error(f"Embedding model warmup failed: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Lifespan context manager for startup and shutdown events."""
+    logger.info("Starting RAG backend server...")
+    logger.info(f"ChromaDB persist dir: {settings.chroma_persist_dir}")
+    logger.info(f"Embedding model: {settings.embedding_model}")
+    logger.info(f"LLM URL: {settings.llm_base_url}")
+
+    # Initialize services
+    from vectordb import vector_db
+    from embeddings import embedding_model
+    from llm import llm_client
+    from batching import batcher
+    from routes.documents import start_upload_pool, stop_upload_pool
+
+    logger.info(f"VectorDB initialized with {vector_db.count()} documents")
+
+    await llm_client.startup()
+    await batcher.start()
+    start_upload_pool()
+
+    if settings.warm_embeddings:
+        # Load in the background so /api/model-status can report progress
+        app.state.warmup_task = asyncio.create_task(
+            warm_embedding_model(embedding_model)
+        )
+    else:
+        logger.info("Embedding model ready (lazy loading enabled)")
+
+    yield
+
+    logger.info("Shutting down RAG backend server...")
+    await batcher.stop()
+    await llm_client.aclose()
+    stop_upload_pool()
+
+
+# Create FastAPI app
+app = FastAPI(
+    title="HR Evaluation RAG Backend",
+    description="RAG-enabled backend for HR evaluation assistant",
+    version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
+
+# Configure CORS
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=settings.cors_origins_list,
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+
+@app.get("/")
+async def root():
+    """Root endpoint."""
+    return {
+        "message": "HR Evaluation RAG Backend",
+        "version": "0.1.0",
+        "docs": "/docs",
+    }
+
+
+@app.get("/health", response_model=HealthResponse)
+async def health_check():
+    """Health check endpoint."""
+    try:
+        from vectordb import vector_db
+
+        # Check ChromaDB connection
+        doc_count = vector_db.count()
+        chroma_status = f"connected ({doc_count} documents)"
+
+        return HealthResponse(
+            status="healthy",
+            version="0.1.0",
+            chroma_status=chroma_status,
+            embedding_model=settings.embedding_model,
+        )
+    except Exception as e:
+        logger.error(f"Health check failed: {e}")
+        return JSONResponse(
+            status_code=503,
+            content={
+                "status": "unhealthy",
+                "error": str(e),
+            },
+        )
+
+
+@app.get("/api/model-status")
+async def model_status():
+    """Get the current status of the embedding model."""
+    try:
+        from embeddings import embedding_model
+
+        return embedding_model.get_status()
+    except Exception as e:
+        logger.error(f"Failed to get model status: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={
+                "status": "error",
+                "is_ready": False,
+                "error": str(e),
+            },
+        )
+
+
+# Import and register routers
+from routes import documents, rag, chat, admin_settings, llm
+
+app.include_router(documents.router, prefix="/api/documents", tags=["documents"])
+app.include_router(rag.router, prefix="/api/rag", tags=["rag"])
+app.include_router(chat.router, prefix="/api/chat", tags=["chat"])
+app.include_router(admin_settings.router, prefix="/api/settings", tags=["settings"])
+app.include_router(llm.router, prefix="/api/llm", tags=["llm"])
+
@@ -0,0 +1,168 @@
+"""Dynamic micro-batching of document embedding requests."""
+
+import asyncio
+import logging
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from config import settings
+from embeddings import embedding_model
+
+logger = logging.getLogger(__name__)
+
+# Queue item: (chunks, future for the result, enqueue time)
+_BatchItem = Tuple[List[str], asyncio.Future, float]
+
+
+class EmbeddingBatcher:
+    """
+    Coalesce concurrent `encode_documents` calls into larger batches.
+
+    Requests submitted within `max_wait_ms` of each other (up to
+    `max_batch_size` chunks) are encoded in one model call off the event
+    loop, and each caller receives its own slice of the result.
+    """
+
+    def __init__(self, max_wait_ms: int, max_batch_size: int):
+        """
+        Initialize the batcher.
+
+        Args:
+            max_wait_ms: Maximum time to wait for more requests to join a batch
+            max_batch_size: Chunk count that triggers an immediate flush
+        """
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Counters exposed through get_stats()
+        self._batches_total = 0
+        self._chunks_total = 0
+        self._last_batch_size = 0
+        self._queue_wait_ms_total = 0.0
+        self._requests_total = 0
+
+    async def start(self) -> None:
+        """Start the background batching task."""
+        if self._task is not None:
+            return
+
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            f"Embedding batcher started "
+            f"(max_wait_ms: {self.max_wait * 1000:.0f}, max_batch_size: {self.max_batch_size})"
+        )
+
+    async def stop(self) -> None:
+        """Stop the background batching task."""
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._queue = None
+        logger.info("Embedding batcher stopped")
+
+    async def submit(self, chunks: List[str]) -> np.ndarray:
+        """
+        Encode document chunks as part of the next batch.
+
+        Args:
+            chunks: Document chunks to encode
+
+        Returns:
+            Array of embedding vectors with shape (len(chunks), dim)
+        """
+        if self._task is None:
+            await self.start()
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((chunks, future, time.monotonic()))
+        return await future
+
+    async def _run(self) -> None:
+        """Drain the queue into batches until cancelled."""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            first = await self._queue.get()
+            batch = [first]
+            size = len(first[0])
+            deadline = loop.time() + self.max_wait
+
+            while size < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                size += len(item[0])
+
+            await self._process(batch)
+
+    async def _process(self, batch: List[_BatchItem]) -> None:
+        """Encode one batch and scatter the results to the waiters."""
+        started = time.monotonic()
+        all_chunks = [chunk for chunks, _, _ in batch for chunk in chunks]
+
+        self._batches_total += 1
+        self._chunks_total += len(all_chunks)
+        self._last_batch_size = len(all_chunks)
+        self._requests_total += len(batch)
+        self._queue_wait_ms_total += sum(
+            (started - enqueued) * 1000 for _, _, enqueued in batch
+        )
+
+        logger.info(f"Encoding batch of {len(all_chunks)} chunks from {len(batch)} requests")
+
+        try:
+            embeddings = await asyncio.get_running_loop().run_in_executor(
+                None, embedding_model.encode_documents, all_chunks
+            )
+        except Exception as e:
+            logger.error(f"Batched encoding failed: {e}")
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        offset = 0
+        for chunks, future, _ in batch:
+            if not future.done():
+                future.set_result(embeddings[offset:offset + len(chunks)])
+            offset += len(chunks)
+
+    def get_stats(self) -> dict:
+        """
+        Get batching statistics.
+
+        Returns:
+            dict: Batch counts, sizes, and average queue wait
+        """
+        return {
+            "batches_total": self._batches_total,
+            "chunks_total": self._chunks_total,
+            "last_batch_size": self._last_batch_size,
+            "avg_queue_wait_ms": (
+                round(self._queue_wait_ms_total / self._requests_total, 2)
+                if self._requests_total else 0.0
+            ),
+        }
+
+
+# Global embedding batcher instance
+batcher = EmbeddingBatcher(
+    max_wait_ms=settings.embedding_batch_wait_ms,
+    max_batch_size=settings.embedding_batch_max_chunks,
+)
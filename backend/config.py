@@ -1,46 +1,101 @@
 """Configuration management for RAG backend."""
 
-from pydantic_settings import BaseSettings
+import os
+from functools import cached_property
 from typing import List
 
+import msgspec
+from dotenv import dotenv_values
 
-class Settings(BaseSettings):
+
+class Settings(msgspec.Struct, dict=True):
     """Application settings."""
 
     # Backend
     backend_port: int = 8000
     backend_host: str = "0.0.0.0"
+    backend_workers: int = 1
+    backend_limit_concurrency: int = 0  # 0 = unlimited
 
     # LLM (llama.cpp server)
     llm_base_url: str = "http://localhost:8080"
+    llm_http2: bool = True
 
     # ChromaDB
     chroma_persist_dir: str = "../chroma_data"
     chroma_collection_name: str = "evaluation_documents"
+    chroma_shards: int = 1  # collections to spread documents over; reset after changing
 
     # Embeddings
     embedding_model: str = "intfloat/multilingual-e5-base"
     embedding_device: str = "cpu"
+    embedding_batch_size: int = 64
+    embedding_dtype: str = "auto"  # auto, float32, float16, bfloat16
+    embedding_backend: str = "sentence_transformers"  # or "onnx"
+    embedding_onnx_dir: str = "./e5-onnx"
+    embedding_onnx_file: str = "model.int8.onnx"
+    embedding_cache_enabled: bool = True
+    embedding_cache_size: int = 1024
+    embedding_cache_max_rows: int = 100_000  # persistent (SQLite) cache bound
+    warm_embeddings: bool = True
+    embedding_batch_wait_ms: int = 10
+    embedding_batch_max_chunks: int = 256
 
     # RAG
     rag_top_k: int = 3
     rag_similarity_threshold: float = 0.5
+    rag_mmr_enabled: bool = True
+    rag_mmr_lambda: float = 0.7
+    rag_mmr_fetch_factor: int = 2
+    query_cache_size: int = 128  # cached vector queries, 0 = disabled (off with >1 worker)
+    query_cache_ttl: float = 60.0  # seconds
     chunk_size: int = 1000
     chunk_overlap: int = 200
+    chunker_backend: str = "python"  # or "fast" (chonkie FastChunker, no overlap)
+    pdf_parser: str = "pdfium"  # pdfium, pymupdf (requires PyMuPDF) or pypdf
+
+    # Semantic response cache
+    response_cache_enabled: bool = True
+    response_cache_collection_name: str = "llm_response_cache"
+    response_cache_threshold: float = 0.95
+    response_cache_ttl: int = 3600
 
     # CORS
     cors_origins: str = "http://localhost:3000,https://localhost:3000"
 
-    @property
+    @cached_property
     def cors_origins_list(self) -> List[str]:
         """Parse CORS origins from comma-separated string."""
         return [origin.strip() for origin in self.cors_origins.split(",")]
 
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
-        extra = "ignore"
+
+def load_settings(env_file: str = ".env") -> Settings:
+    """
+    Load settings from the .env file and environment variables.
+
+    Environment variables take precedence over the .env file. Keys are
+    matched case-insensitively and unknown keys are ignored.
+
+    Args:
+        env_file: Path to the .env file
+
+    Returns:
+        Parsed settings
+    """
+    values = {
+        key.lower(): value
+        for key, value in dotenv_values(env_file).items()
+        if value is not None
+    }
+    values.update({key.lower(): value for key, value in os.environ.items()})
+
+    fields = set(Settings.__struct_fields__)
+    return msgspec.convert(
+        {key: value for key, value in values.items() if key in fields},
+        Settings,
+        strict=False,
+    )
 
 
 # Global settings instance
-settings = Settings()
+settings = load_settings()
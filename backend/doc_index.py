@@ -0,0 +1,209 @@
+"""SQLite sidecar index of per-document aggregates for fast listing."""
+
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+
+from config import settings
+from text_processing import format_timestamp
+from vectordb import vector_db
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentIndex:
+    """
+    Per-filename aggregates (chunk count, chars, timestamp) kept in SQLite.
+
+    Maintained by the upload/delete routes so listing documents does not
+    need to scan every chunk's metadata in ChromaDB.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open (or create) the index database.
+
+        Args:
+            path: SQLite database file path
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._initialize()
+
+    def _initialize(self):
+        """Create the table and backfill it from ChromaDB if needed."""
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS documents (
+                    filename TEXT PRIMARY KEY,
+                    file_type TEXT NOT NULL,
+                    category TEXT NOT NULL DEFAULT '',
+                    chunk_count INTEGER NOT NULL,
+                    total_chars INTEGER NOT NULL,
+                    upload_timestamp TEXT NOT NULL
+                )
+                """
+            )
+            self._conn.commit()
+
+            # Rebuild when empty or out of step with ChromaDB (e.g. a crash
+            # between adding chunks and recording them here)
+            row = self._conn.execute(
+                "SELECT COALESCE(SUM(chunk_count), 0) FROM documents"
+            ).fetchone()
+            chroma_count = vector_db.count()
+            if row[0] != chroma_count:
+                logger.info(
+                    f"Document index has {row[0]} chunks, ChromaDB has "
+                    f"{chroma_count}; rebuilding"
+                )
+                self.rebuild()
+
+            logger.info(f"Document index initialized at: {self.path}")
+
+        except Exception as e:
+            logger.error(f"Failed to initialize document index: {e}")
+            raise
+
+    def rebuild(self) -> None:
+        """Rebuild the index from chunk metadata stored in ChromaDB."""
+        results = vector_db.get_all_documents(include=["metadatas"])
+
+        documents: Dict[str, Dict[str, Any]] = {}
+        for metadata in results["metadatas"]:
+            filename = metadata.get("filename", "unknown")
+            doc = documents.setdefault(filename, {
+                "filename": filename,
+                "file_type": metadata.get("file_type", "unknown"),
+                "category": metadata.get("category", ""),
+                "chunk_count": 0,
+                "total_chars": 0,
+                "upload_timestamp": format_timestamp(metadata.get("upload_timestamp", "")),
+            })
+            doc["chunk_count"] += 1
+            doc["total_chars"] += metadata.get("char_count", 0)
+
+        with self._lock:
+            self._conn.execute("DELETE FROM documents")
+            self._conn.executemany(
+                """
+                INSERT INTO documents
+                    (filename, file_type, category, chunk_count, total_chars, upload_timestamp)
+                VALUES
+                    (:filename, :file_type, :category, :chunk_count, :total_chars, :upload_timestamp)
+                """,
+                list(documents.values()),
+            )
+            self._conn.commit()
+
+        logger.info(f"Rebuilt document index: {len(documents)} documents")
+
+    def add_chunks(self, metadatas: List[Dict[str, Any]]) -> None:
+        """
+        Record newly indexed chunks of one document.
+
+        Args:
+            metadatas: Metadata of the chunks that were added
+        """
+        if not metadatas:
+            return
+
+        first = metadatas[0]
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO documents
+                    (filename, file_type, category, chunk_count, total_chars, upload_timestamp)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(filename) DO UPDATE SET
+                    file_type = excluded.file_type,
+                    category = excluded.category,
+                    chunk_count = chunk_count + excluded.chunk_count,
+                    total_chars = total_chars + excluded.total_chars,
+                    upload_timestamp = excluded.upload_timestamp
+                """,
+                (
+                    first.get("filename", "unknown"),
+                    first.get("file_type", "unknown"),
+                    first.get("category", ""),
+                    len(metadatas),
+                    sum(m.get("char_count", 0) for m in metadatas),
+                    format_timestamp(first.get("upload_timestamp", "")),
+                ),
+            )
+            self._conn.commit()
+
+    def remove_chunks(self, metadatas: List[Dict[str, Any]]) -> None:
+        """
+        Record deleted chunks; rows whose chunk count reaches zero are removed.
+
+        Args:
+            metadatas: Metadata of the chunks that were deleted
+        """
+        with self._lock:
+            for metadata in metadatas:
+                self._conn.execute(
+                    """
+                    UPDATE documents
+                    SET chunk_count = chunk_count - 1, total_chars = total_chars - ?
+                    WHERE filename = ?
+                    """,
+                    (metadata.get("char_count", 0), metadata.get("filename", "unknown")),
+                )
+            self._conn.execute("DELETE FROM documents WHERE chunk_count <= 0")
+            self._conn.commit()
+
+    def remove_document(self, filename: str) -> None:
+        """
+        Remove a document from the index.
+
+        Args:
+            filename: Filename to remove
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM documents WHERE filename = ?", (filename,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Remove all documents from the index."""
+        with self._lock:
+            self._conn.execute("DELETE FROM documents")
+            self._conn.commit()
+
+    def list(self, category: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        List documents, optionally filtered by category.
+
+        Args:
+            category: Optional category filter
+
+        Returns:
+            Document summaries in upload order
+        """
+        query = (
+            "SELECT filename, file_type, chunk_count, upload_timestamp, total_chars "
+            "FROM documents"
+        )
+        params: tuple = ()
+        if category:
+            query += " WHERE category = ?"
+            params = (category,)
+        query += " ORDER BY rowid"
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [dict(row) for row in rows]
+
+
+# Global document index instance
+doc_index = DocumentIndex(
+    os.path.join(os.path.abspath(settings.chroma_persist_dir), "doc_index.sqlite3")
+)
@@ -0,0 +1,126 @@
+"""Persistent SQLite cache for query embeddings."""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from typing import Optional
+
+import numpy as np
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """SQLite-backed key/value store of embedding vectors, oldest rows evicted."""
+
+    def __init__(self, path: str, max_rows: int):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: SQLite database file path
+            max_rows: Maximum number of cached vectors
+        """
+        self.path = path
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._initialize()
+
+    def _initialize(self):
+        """Create the database file and table."""
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS emb (key TEXT PRIMARY KEY, vec BLOB NOT NULL)"
+            )
+            self._conn.commit()
+            logger.info(f"Embedding cache initialized at: {self.path}")
+
+        except Exception as e:
+            logger.error(f"Failed to initialize embedding cache: {e}")
+            raise
+
+    @staticmethod
+    def make_key(text: str) -> str:
+        """
+        Build a cache key for a (prefixed) text and the current encoder.
+
+        The backend, dtype and device (which "auto" dtype depends on) are part
+        of the key, so vectors from other numerics are never served.
+
+        Args:
+            text: Exact text passed to the encoder
+
+        Returns:
+            Hex digest key
+        """
+        encoder = (
+            settings.embedding_model,
+            settings.embedding_backend,
+            settings.embedding_onnx_file if settings.embedding_backend == "onnx"
+            else settings.embedding_dtype,
+            settings.embedding_device,
+        )
+        content = "\0".join((*encoder, text))
+        return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """
+        Get a cached vector.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Embedding vector, or None on miss
+        """
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT vec FROM emb WHERE key = ?", (key,)
+                ).fetchone()
+        except Exception as e:
+            logger.warning(f"Embedding cache read failed: {e}")
+            return None
+
+        if row is None:
+            return None
+        # frombuffer over bytes yields a read-only array, safe to share
+        return np.frombuffer(row[0], dtype=np.float32)
+
+    def set(self, key: str, vector: np.ndarray) -> None:
+        """
+        Store a vector.
+
+        Args:
+            key: Cache key
+            vector: Embedding vector
+        """
+        blob = np.asarray(vector, dtype=np.float32).tobytes()
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO emb (key, vec) VALUES (?, ?)", (key, blob)
+                )
+                # Rowids grow with each insert, so this drops the oldest rows
+                self._conn.execute(
+                    "DELETE FROM emb WHERE rowid <= (SELECT MAX(rowid) FROM emb) - ?",
+                    (self.max_rows,),
+                )
+                self._conn.commit()
+        except Exception as e:
+            logger.warning(f"Embedding cache write failed: {e}")
+
+
+# Global embedding cache instance
+embedding_cache = EmbeddingCache(
+    os.path.join(os.path.abspath(settings.chroma_persist_dir), "embedding_cache.sqlite3"),
+    max_rows=settings.embedding_cache_max_rows,
+)
@@ -1,8 +1,14 @@
 """Text embedding generation using Sentence Transformers."""
 
+import functools
 import logging
+import os
+import re
+import threading
 import time
+import unicodedata
 from typing import List, Literal
+import numpy as np
 from sentence_transformers import SentenceTransformer
 
 from config import settings
@@ -12,6 +18,24 @@ logger = logging.getLogger(__name__)
 # Model status type
 ModelStatus = Literal["not_loaded", "downloading", "loading", "ready", "error"]
 
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize query text so trivially different inputs share cache entries.
+
+    Applies NFKC (the tokenizer normalizes this way anyway) and collapses
+    whitespace runs. Case is preserved because the model is cased.
+
+    Args:
+        query: Raw query text
+
+    Returns:
+        Normalized query text
+    """
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFKC", query)).strip()
+
 
 class EmbeddingModel:
     """Wrapper for Sentence Transformers embedding model."""
@@ -24,23 +48,60 @@ class EmbeddingModel:
         self._status: ModelStatus = "not_loaded"
         self._error_message: str | None = None
         self._load_start_time: float | None = None
+        # Startup warmup and the first request may race to load the model
+        self._load_lock = threading.Lock()
+        # E5 models expect "query: " / "passage: " prefixes
+        self._is_e5 = "e5" in settings.embedding_model.lower()
+        # In-process LRU in front of the persistent query embedding cache
+        self._encode_query_cached = functools.lru_cache(
+            maxsize=settings.embedding_cache_size
+        )(self._encode_query_uncached)
 
     def _load_model(self):
-        """Load the Sentence Transformers model."""
+        """Load the embedding model for the configured backend."""
+        with self._load_lock:
+            self._load_model_locked()
+
+    def _load_model_locked(self):
+        """Load the model; caller must hold the load lock."""
         if self._is_loaded:
             return
 
         try:
-            logger.info(f"Loading embedding model: {settings.embedding_model}")
+            logger.info(
+                f"Loading embedding model: {settings.embedding_model} "
+                f"(backend: {settings.embedding_backend})"
+            )
             self._status = "downloading"
             self._load_start_time = time.time()
 
-            self.model = SentenceTransformer(
-                settings.embedding_model,
-                device=settings.embedding_device,
-            )
+            if settings.embedding_backend == "onnx":
+                # INT8-quantized ONNX Runtime encoder (see export_onnx.py)
+                from onnx_embeddings import load_onnx_encoder
+
+                self.model = load_onnx_encoder()
+                self._status = "loading"
+            else:
+                import torch
+
+                # Respect the thread cap set in app.py (OMP_NUM_THREADS)
+                num_threads = os.environ.get("OMP_NUM_THREADS")
+                if num_threads:
+                    torch.set_num_threads(int(num_threads))
+
+                # Load weights directly in the target precision (no post-load cast)
+                dtype = self._resolve_dtype()
+                model_kwargs = {}
+                if dtype != "float32":
+                    model_kwargs["torch_dtype"] = getattr(torch, dtype)
 
-            self._status = "loading"
+                self.model = SentenceTransformer(
+                    settings.embedding_model,
+                    device=settings.embedding_device,
+                    model_kwargs=model_kwargs,
+                )
+
+                self._status = "loading"
 
             # Get embedding dimension
             self.embedding_dim = self.model.get_sentence_embedding_dimension()
@@ -48,7 +109,8 @@ class EmbeddingModel:
             elapsed_time = time.time() - self._load_start_time
             logger.info(
                 f"Embedding model loaded successfully "
-                f"(dimension: {self.embedding_dim}, took {elapsed_time:.1f}s)"
+                f"(dimension: {self.embedding_dim}, dtype: {self._resolve_dtype()}, "
+                f"took {elapsed_time:.1f}s)"
             )
 
             self._is_loaded = True
@@ -63,6 +125,22 @@ class EmbeddingModel:
             self._load_start_time = None
             raise
 
+    @staticmethod
+    def _resolve_dtype() -> str:
+        """
+        Resolve the torch dtype name for the SentenceTransformers backend.
+
+        "auto" uses float16 on GPU (no accuracy loss for E5) and float32 on
+        CPU, where bf16 is only faster with native hardware support.
+
+        Returns:
+            One of "float32", "float16", "bfloat16"
+        """
+        dtype = settings.embedding_dtype
+        if dtype == "auto":
+            return "float16" if settings.embedding_device.startswith("cuda") else "float32"
+        return dtype
+
     def get_status(self) -> dict:
         """
         Get the current status of the embedding model.
@@ -82,16 +160,22 @@ class EmbeddingModel:
             "elapsed_seconds": elapsed_seconds,
         }
 
-    def encode(self, texts: List[str], show_progress: bool = False) -> List[List[float]]:
+    def encode(
+        self,
+        texts: List[str],
+        show_progress: bool = False,
+        prompt: str | None = None,
+    ) -> np.ndarray:
         """
         Encode texts to embedding vectors.
 
         Args:
             texts: List of text strings to encode
             show_progress: Whether to show progress bar
+            prompt: Optional prefix prepended to each text at tokenization
 
         Returns:
-            List of embedding vectors
+            Array of embedding vectors with shape (len(texts), dim)
         """
         # Lazy load model on first use
         if not self._is_loaded:
@@ -102,22 +186,21 @@ class EmbeddingModel:
 
             embeddings = self.model.encode(
                 texts,
+                prompt=prompt,
+                batch_size=settings.embedding_batch_size,
                 convert_to_numpy=True,
                 show_progress_bar=show_progress,
                 normalize_embeddings=True,  # Normalize for cosine similarity
             )
 
-            # Convert to list of lists
-            embeddings_list = embeddings.tolist()
-
             logger.debug(f"Encoded {len(texts)} texts to embeddings")
-            return embeddings_list
+            return embeddings
 
         except Exception as e:
             logger.error(f"Failed to encode texts: {e}")
             raise
 
-    def encode_query(self, query: str) -> List[float]:
+    def encode_query(self, query: str) -> np.ndarray:
         """
         Encode a single query text.
 
@@ -128,10 +211,15 @@ class EmbeddingModel:
             Embedding vector
         """
         try:
+            query = normalize_query(query)
+
             # For E5 models, add "query: " prefix for better retrieval
-            if "e5" in settings.embedding_model.lower():
+            if self._is_e5:
                 query = f"query: {query}"
 
+            if settings.embedding_cache_enabled:
+                return self._encode_query_cached(query)
+
             embeddings = self.encode([query], show_progress=False)
             return embeddings[0]
 
@@ -139,7 +227,31 @@ class EmbeddingModel:
             logger.error(f"Failed to encode query: {e}")
             raise
 
-    def encode_documents(self, documents: List[str]) -> List[List[float]]:
+    def _encode_query_uncached(self, query: str) -> np.ndarray:
+        """
+        Encode a prefixed query through the persistent embedding cache.
+
+        Args:
+            query: Query text with any model prefix already applied
+
+        Returns:
+            Embedding vector
+        """
+        from embedding_cache import embedding_cache
+
+        key = embedding_cache.make_key(query)
+        cached = embedding_cache.get(key)
+        if cached is not None:
+            logger.debug("Query embedding cache hit")
+            return cached
+
+        embedding = self.encode([query], show_progress=False)[0]
+        # Cached arrays are shared between callers
+        embedding.setflags(write=False)
+        embedding_cache.set(key, embedding)
+        return embedding
+
+    def encode_documents(self, documents: List[str]) -> np.ndarray:
         """
         Encode documents for indexing.
 
@@ -147,14 +259,13 @@ class EmbeddingModel:
             documents: List of document texts
 
         Returns:
-            List of embedding vectors
+            Array of embedding vectors with shape (len(documents), dim)
         """
         try:
             # For E5 models, add "passage: " prefix for documents
-            if "e5" in settings.embedding_model.lower():
-                documents = [f"passage: {doc}" for doc in documents]
+            prompt = "passage: " if self._is_e5 else None
 
-            return self.encode(documents, show_progress=True)
+            return self.encode(documents, show_progress=True, prompt=prompt)
 
         except Exception as e:
             logger.error(f"Failed to encode documents: {e}")
@@ -0,0 +1,67 @@
+"""
+Export the embedding model to ONNX with dynamic INT8 quantization.
+
+Usage:
+    pip install "optimum[onnxruntime]"
+    python export_onnx.py
+
+Then set EMBEDDING_BACKEND=onnx to serve embeddings through ONNX Runtime.
+"""
+
+import argparse
+import logging
+from pathlib import Path
+
+from config import settings
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="[%(asctime)s] %(levelname)s - %(name)s - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+logger = logging.getLogger(__name__)
+
+
+def export_model(model_name: str, output_dir: str, quantized_file: str) -> Path:
+    """
+    Export a Hugging Face model to ONNX and quantize it to INT8.
+
+    Args:
+        model_name: Hugging Face model name
+        output_dir: Directory for the exported model and tokenizer
+        quantized_file: Filename of the quantized model
+
+    Returns:
+        Path to the quantized model
+    """
+    from optimum.onnxruntime import ORTModelForFeatureExtraction
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoTokenizer
+
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    logger.info(f"Exporting {model_name} to ONNX: {output_path}")
+    model = ORTModelForFeatureExtraction.from_pretrained(model_name, export=True)
+    model.save_pretrained(output_path)
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(output_path)
+
+    quantized_path = output_path / quantized_file
+    logger.info(f"Quantizing to INT8: {quantized_path}")
+    quantize_dynamic(
+        str(output_path / "model.onnx"),
+        str(quantized_path),
+        weight_type=QuantType.QInt8,
+    )
+
+    return quantized_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", default=settings.embedding_model)
+    parser.add_argument("--output", default=settings.embedding_onnx_dir)
+    args = parser.parse_args()
+
+    path = export_model(args.model, args.output, settings.embedding_onnx_file)
+    logger.info(f"Done: {path}")
@@ -1,9 +1,9 @@
 """LLM client for llama.cpp server."""
 
 import logging
-import json
 from typing import List, Dict, Any, AsyncGenerator
 import httpx
+import orjson
 
 from config import settings
 from models import Message
@@ -12,6 +12,40 @@ from system_prompts import get_system_prompt
 logger = logging.getLogger(__name__)
 
 
+# Marker preceding the delta text in llama.cpp streaming chunks
+_CONTENT_MARKER = '"content":"'
+
+
+def _content_frame_from_delta(data: str) -> str | None:
+    """
+    Build the frontend frame from a llama.cpp delta without parsing JSON.
+
+    The content value in the upstream chunk is already a valid JSON string,
+    so it can be copied verbatim into {"content": "..."}.
+
+    Args:
+        data: Payload of an SSE "data:" line
+
+    Returns:
+        Frame JSON string, or None if the chunk needs a full parse
+    """
+    start = data.find(_CONTENT_MARKER)
+    if start == -1:
+        return None
+
+    start += len(_CONTENT_MARKER)
+    end = data.find('"', start)
+    if end <= start:
+        return None
+
+    raw = data[start:end]
+    # Escapes may hide the real closing quote; let the full parser handle them
+    if "\\" in raw:
+        return None
+
+    return '{"content":"' + raw + '"}'
+
+
 class LLMClient:
     """Client for llama.cpp OpenAI-compatible API."""
 
@@ -19,6 +53,37 @@ class LLMClient:
         """Initialize LLM client."""
         self.base_url = settings.llm_base_url
         self.timeout = httpx.Timeout(120.0, connect=10.0)
+        self._client: httpx.AsyncClient | None = None
+
+    async def startup(self) -> None:
+        """Create the shared HTTP client (reused across requests for keep-alive)."""
+        if self._client is not None:
+            return
+
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_keepalive_connections=32,
+                max_connections=64,
+                keepalive_expiry=60.0,
+            ),
+            # h2 multiplexes concurrent streams; llama.cpp itself may only speak HTTP/1.1
+            http2=settings.llm_http2,
+        )
+        logger.info(f"LLM HTTP client started (http2: {settings.llm_http2})")
+
+    async def get_client(self) -> httpx.AsyncClient:
+        """Get the shared HTTP client, starting it if lifespan has not run (e.g. scripts)."""
+        if self._client is None:
+            await self.startup()
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the shared HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            logger.info("LLM HTTP client closed")
 
     async def chat_completion(
         self,
@@ -57,47 +122,54 @@ class LLMClient:
                 "stream": stream,
             }
 
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                if stream:
-                    # Streaming response
-                    async with client.stream(
-                        "POST",
-                        f"{self.base_url}/v1/chat/completions",
-                        json=payload,
-                    ) as response:
-                        response.raise_for_status()
-
-                        async for line in response.aiter_lines():
-                            if line.startswith("data: "):
-                                data = line[6:]  # Remove "data: " prefix
-
-                                if data == "[DONE]":
-                                    break
-
-                                # Parse llama.cpp format and extract content
-                                try:
-                                    parsed = json.loads(data)
-                                    # llama.cpp format: {"choices": [{"delta": {"content": "..."}}]}
-                                    choices = parsed.get("choices", [])
-                                    if choices:
-                                        delta = choices[0].get("delta", {})
-                                        content = delta.get("content", "")
-                                        if content:
-                                            # Return in simplified format for frontend
-                                            yield json.dumps({"content": content})
-                                except json.JSONDecodeError:
-                                    # Pass through if not valid JSON
-                                    logger.warning(f"Failed to parse LLM response: {data}")
-                                    continue
-
-                else:
-                    # Non-streaming response
-                    response = await client.post(
-                        f"{self.base_url}/v1/chat/completions",
-                        json=payload,
-                    )
+            client = await self.get_client()
+
+            if stream:
+                # Streaming response
+                async with client.stream(
+                    "POST",
+                    f"{self.base_url}/v1/chat/completions",
+                    json=payload,
+                ) as response:
                     response.raise_for_status()
-                    yield response.text
+
+                    async for line in response.aiter_lines():
+                        if line.startswith("data: "):
+                            data = line[6:]  # Remove "data: " prefix
+
+                            if data == "[DONE]":
+                                break
+
+                            # Fast path: reuse the already-escaped content string
+                            frame = _content_frame_from_delta(data)
+                            if frame is not None:
+                                yield frame
+                                continue
+
+                            # Parse llama.cpp format and extract content
+                            try:
+                                parsed = orjson.loads(data)
+                                # llama.cpp format: {"choices": [{"delta": {"content": "..."}}]}
+                                choices = parsed.get("choices", [])
+                                if choices:
+                                    delta = choices[0].get("delta", {})
+                                    content = delta.get("content", "")
+                                    if content:
+                                        # Return in simplified format for frontend
+                                        yield orjson.dumps({"content": content}).decode()
+                            except orjson.JSONDecodeError:
+                                # Pass through if not valid JSON
+                                logger.warning(f"Failed to parse LLM response: {data}")
+                                continue
+
+            else:
+                # Non-streaming response
+                response = await client.post(
+                    f"{self.base_url}/v1/chat/completions",
+                    json=payload,
+                )
+                response.raise_for_status()
+                yield response.text
 
         except httpx.HTTPError as e:
             logger.error(f"LLM API HTTP error: {e}")
@@ -1,7 +1,7 @@
 """Pydantic models for API requests and responses."""
 
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 
 
 # Chat Models
@@ -27,7 +27,7 @@ class DocumentMetadata(BaseModel):
     file_type: str
     chunk_index: int
     total_chunks: int
-    upload_timestamp: str
+    upload_timestamp: Union[int, str]  # epoch seconds (ISO string on older documents)
 
 
 class Document(BaseModel):
@@ -51,6 +51,16 @@ class DocumentListResponse(BaseModel):
     total_count: int
 
 
+class DocumentListResponseSoA(BaseModel):
+    """Response for document list in columnar (struct-of-arrays) layout."""
+    filenames: List[str]
+    file_types: List[str]
+    chunk_counts: List[int]
+    upload_timestamps: List[str]
+    total_chars: List[int]
+    total_count: int
+
+
 # RAG Models
 class RAGQueryRequest(BaseModel):
     """RAG query request."""
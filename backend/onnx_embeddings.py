@@ -0,0 +1,127 @@
+"""ONNX Runtime backend for text embeddings (INT8-quantized E5)."""
+
+import logging
+import os
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class OnnxSentenceEncoder:
+    """
+    Minimal SentenceTransformer-compatible encoder backed by ONNX Runtime.
+
+    Runs the exported transformer, then applies mean pooling and optional
+    L2 normalization in NumPy.
+    """
+
+    def __init__(self, model_dir: str, model_file: str, max_length: int = 512):
+        """
+        Load the ONNX session and matching tokenizer.
+
+        Args:
+            model_dir: Directory containing the exported model and tokenizer
+            model_file: ONNX model filename inside model_dir
+            max_length: Maximum tokens per text
+        """
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        model_path = Path(model_dir) / model_file
+        if not model_path.exists():
+            raise FileNotFoundError(
+                f"ONNX model not found: {model_path} (run export_onnx.py first)"
+            )
+
+        session_options = ort.SessionOptions()
+        session_options.intra_op_num_threads = int(os.environ.get("OMP_NUM_THREADS", "0"))
+        # Fuse the quantized MatMul/attention subgraphs into INT8 kernels
+        session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        session_options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+
+        self.session = ort.InferenceSession(
+            str(model_path),
+            sess_options=session_options,
+            providers=["CPUExecutionProvider"],
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.max_length = max_length
+        self._input_names = {i.name for i in self.session.get_inputs()}
+        self._embedding_dim = self.session.get_outputs()[0].shape[-1]
+
+        logger.info(f"ONNX embedding model loaded: {model_path}")
+
+    def get_sentence_embedding_dimension(self) -> int:
+        """Get the embedding dimension."""
+        return self._embedding_dim
+
+    def encode(
+        self,
+        sentences: List[str],
+        prompt: str | None = None,
+        batch_size: int = 32,
+        show_progress_bar: bool = False,
+        convert_to_numpy: bool = True,
+        normalize_embeddings: bool = False,
+    ) -> np.ndarray:
+        """
+        Encode texts to embedding vectors.
+
+        Args:
+            sentences: List of text strings to encode
+            prompt: Optional prefix prepended to each text
+            batch_size: Number of texts per forward pass
+            show_progress_bar: Unused; kept for interface compatibility
+            convert_to_numpy: Unused; results are always NumPy arrays
+            normalize_embeddings: Whether to L2-normalize the vectors
+
+        Returns:
+            Array of shape (len(sentences), dim)
+        """
+        if prompt:
+            sentences = [prompt + s for s in sentences]
+
+        embeddings = np.zeros((len(sentences), self._embedding_dim), dtype=np.float32)
+
+        # Sort by length so each batch pads to a similar size
+        order = np.argsort([-len(s) for s in sentences])
+
+        for start in range(0, len(sentences), batch_size):
+            batch_idx = order[start:start + batch_size]
+            encoded = self.tokenizer(
+                [sentences[i] for i in batch_idx],
+                padding=True,
+                truncation=True,
+                max_length=self.max_length,
+                return_tensors="np",
+            )
+            inputs = {
+                name: value.astype(np.int64)
+                for name, value in encoded.items()
+                if name in self._input_names
+            }
+            hidden = self.session.run(None, inputs)[0]
+
+            # Mean pooling over non-padding tokens
+            mask = encoded["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+            embeddings[batch_idx] = pooled
+
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings /= np.maximum(norms, 1e-12)
+
+        return embeddings
+
+
+def load_onnx_encoder() -> OnnxSentenceEncoder:
+    """Create the ONNX encoder from settings."""
+    return OnnxSentenceEncoder(
+        model_dir=settings.embedding_onnx_dir,
+        model_file=settings.embedding_onnx_file,
+    )
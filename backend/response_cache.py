@@ -0,0 +1,165 @@
+"""Semantic response cache for LLM chat completions."""
+
+import logging
+import time
+import uuid
+from typing import Optional
+
+import numpy as np
+
+from config import settings
+from vectordb import distance_space, distances_to_similarities, vector_db
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticResponseCache:
+    """Cache full LLM responses keyed by query embedding similarity."""
+
+    def __init__(self):
+        """Initialize the response cache collection."""
+        self.collection = None
+        self.space = "cosine"
+        self._initialize()
+
+    def _initialize(self):
+        """Get or create the dedicated ChromaDB collection for cached responses."""
+        try:
+            self.collection = vector_db.client.get_or_create_collection(
+                name=settings.response_cache_collection_name,
+                metadata={"description": "LLM response cache", "hnsw:space": "cosine"},
+                embedding_function=None,
+            )
+            self.space = distance_space(self.collection)
+            logger.info(
+                f"Response cache initialized: collection "
+                f"'{settings.response_cache_collection_name}'"
+            )
+
+        except Exception as e:
+            logger.error(f"Failed to initialize response cache: {e}")
+            raise
+
+    @staticmethod
+    def _build_where(use_rag: bool, category: Optional[str], top_k: int) -> dict:
+        """Build the metadata filter so hits only match the same request mode."""
+        return {
+            "$and": [
+                {"use_rag": use_rag},
+                {"category": category or ""},
+                {"top_k": top_k},
+                {"expires_at": {"$gt": int(time.time())}},
+            ]
+        }
+
+    def clear(self) -> None:
+        """Drop every cached response (after the corpus or system prompt changes)."""
+        try:
+            ids = self.collection.get(include=[])["ids"]
+            if ids:
+                self.collection.delete(ids=ids)
+                logger.info(f"Cleared {len(ids)} cached responses")
+
+        except Exception as e:
+            logger.warning(f"Failed to clear response cache: {e}")
+
+    def lookup(
+        self,
+        query_embedding: np.ndarray,
+        use_rag: bool = True,
+        category: Optional[str] = None,
+        top_k: int = 0,
+        threshold: Optional[float] = None,
+    ) -> Optional[str]:
+        """
+        Look up a cached response for a semantically similar query.
+
+        Args:
+            query_embedding: Normalized query embedding vector
+            use_rag: Whether the request uses RAG context
+            category: RAG category filter of the request
+            top_k: Number of RAG context chunks the request asks for
+            threshold: Minimum cosine similarity for a hit
+
+        Returns:
+            Cached response text, or None on miss
+        """
+        if threshold is None:
+            threshold = settings.response_cache_threshold
+
+        try:
+            if self.collection.count() == 0:
+                return None
+
+            results = self.collection.query(
+                query_embeddings=[query_embedding],
+                n_results=1,
+                where=self._build_where(use_rag, category, top_k),
+            )
+
+            if not results["ids"][0]:
+                return None
+
+            similarity = float(
+                distances_to_similarities(results["distances"][0], self.space)[0]
+            )
+
+            if similarity < threshold:
+                return None
+
+            logger.info(f"Response cache hit (similarity: {similarity:.4f})")
+            return results["documents"][0][0]
+
+        except Exception as e:
+            # A broken cache must never break chat
+            logger.warning(f"Response cache lookup failed: {e}")
+            return None
+
+    def store(
+        self,
+        query_embedding: np.ndarray,
+        response_text: str,
+        use_rag: bool = True,
+        category: Optional[str] = None,
+        top_k: int = 0,
+        ttl: Optional[int] = None,
+    ) -> None:
+        """
+        Store a full response for a query embedding.
+
+        Args:
+            query_embedding: Normalized query embedding vector
+            response_text: Complete LLM response text
+            use_rag: Whether the request used RAG context
+            category: RAG category filter of the request
+            top_k: Number of RAG context chunks the request asked for
+            ttl: Time to live in seconds
+        """
+        if ttl is None:
+            ttl = settings.response_cache_ttl
+
+        try:
+            now = int(time.time())
+
+            # Drop expired entries so the collection does not grow unbounded
+            self.collection.delete(where={"expires_at": {"$lte": now}})
+
+            self.collection.add(
+                ids=[uuid.uuid4().hex],
+                documents=[response_text],
+                embeddings=[query_embedding],
+                metadatas=[{
+                    "use_rag": use_rag,
+                    "category": category or "",
+                    "top_k": top_k,
+                    "expires_at": now + ttl,
+                }],
+            )
+            logger.debug("Stored response in cache")
+
+        except Exception as e:
+            logger.warning(f"Failed to store response in cache: {e}")
+
+
+# Global response cache instance
+response_cache = SemanticResponseCache()
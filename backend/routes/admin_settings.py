@@ -1,11 +1,16 @@
 """Settings management API routes."""
 
-import json
 import logging
 import os
 from pathlib import Path
+from typing import Optional, Tuple
+
+import orjson
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+
+from response_cache import response_cache
 
 logger = logging.getLogger(__name__)
 
@@ -28,22 +33,40 @@ DEFAULT_SETTINGS = {
 }
 
 
+# Parsed settings cache: (st_mtime_ns, settings)
+_SETTINGS_CACHE: Optional[Tuple[int, dict]] = None
+
+
 def load_settings() -> dict:
-    """Load settings from file."""
-    if SETTINGS_FILE.exists():
-        try:
-            with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error(f"Failed to load settings: {e}")
+    """Load settings from file (cached until the file's mtime changes)."""
+    global _SETTINGS_CACHE
+
+    try:
+        mtime_ns = SETTINGS_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        return DEFAULT_SETTINGS.copy()
+
+    if _SETTINGS_CACHE is not None and _SETTINGS_CACHE[0] == mtime_ns:
+        return _SETTINGS_CACHE[1].copy()
+
+    try:
+        data = orjson.loads(SETTINGS_FILE.read_bytes())
+        _SETTINGS_CACHE = (mtime_ns, data)
+        return data.copy()
+    except Exception as e:
+        logger.error(f"Failed to load settings: {e}")
     return DEFAULT_SETTINGS.copy()
 
 
 def save_settings(settings: dict) -> None:
-    """Save settings to file."""
+    """Save settings to file atomically."""
+    global _SETTINGS_CACHE
+
     try:
-        with open(SETTINGS_FILE, "w", encoding="utf-8") as f:
-            json.dump(settings, f, ensure_ascii=False, indent=2)
+        _SETTINGS_CACHE = None
+        tmp_file = SETTINGS_FILE.with_suffix(".tmp")
+        tmp_file.write_bytes(orjson.dumps(settings, option=orjson.OPT_INDENT_2))
+        os.replace(tmp_file, SETTINGS_FILE)
     except Exception as e:
         logger.error(f"Failed to save settings: {e}")
         raise
@@ -78,6 +101,8 @@ async def update_system_prompt(request: SystemPromptRequest):
         settings = load_settings()
         settings["system_prompt"] = request.system_prompt
         save_settings(settings)
+        # Cached answers were generated under the old prompt
+        await run_in_threadpool(response_cache.clear)
 
         logger.info("System prompt updated")
 
@@ -100,6 +125,7 @@ async def reset_system_prompt():
         settings = load_settings()
         settings["system_prompt"] = DEFAULT_SETTINGS["system_prompt"]
         save_settings(settings)
+        await run_in_threadpool(response_cache.clear)
 
         logger.info("System prompt reset to default")
 
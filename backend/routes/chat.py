@@ -1,14 +1,18 @@
 """RAG-enabled chat API routes."""
 
 import logging
-import json
+import numpy as np
+import orjson
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
 from models import ChatRequest, Message
 from vectordb import vector_db
 from embeddings import embedding_model
 from llm import llm_client, create_rag_prompt
+from response_cache import response_cache
+from vector_ops import mmr_select
 from config import settings
 
 logger = logging.getLogger(__name__)
@@ -24,9 +28,15 @@ async def chat_with_rag(request: ChatRequest):
     This endpoint:
     1. Takes the user's latest message
     2. If RAG is enabled, retrieves relevant context from vector database
-    3. Constructs a prompt with context
-    4. Calls llama.cpp for completion
-    5. Streams the response back to the client
+    3. Returns a cached response if a semantically similar query was answered
+    4. Constructs a prompt with context
+    5. Calls llama.cpp for completion
+    6. Streams the response back to the client
+
+    The stream is Server-Sent Events: one `data: {"content": "..."}` frame per
+    token delta, an optional `data: {"error": "..."}` frame, and a final
+    `data: [DONE]`. Clients read the `content` field rather than the raw
+    OpenAI-style `choices[0].delta` schema.
     """
     try:
         logger.info(f"Chat request (RAG: {request.use_rag})")
@@ -45,50 +55,100 @@ async def chat_with_rag(request: ChatRequest):
         # Prepare messages for LLM
         messages = list(request.messages)
 
+        doc_count = vector_db.count() if request.use_rag else 0
+
+        # Only cache single-turn streaming answers; follow-ups depend on history
+        use_cache = (
+            settings.response_cache_enabled
+            and request.stream
+            and len(user_messages) == 1
+        )
+
+        # Get top_k from request or use default
+        top_k = request.top_k or settings.rag_top_k
+
+        # Generate query embedding once for both the cache and RAG retrieval
+        query_embedding = None
+        if use_cache or doc_count > 0:
+            query_embedding = await run_in_threadpool(
+                embedding_model.encode_query, latest_message
+            )
+
+        if use_cache:
+            cached = await run_in_threadpool(
+                response_cache.lookup,
+                query_embedding,
+                use_rag=request.use_rag,
+                category=request.category,
+                top_k=top_k,
+            )
+            if cached is not None:
+                async def generate_cached():
+                    yield f"data: {orjson.dumps({'content': cached}).decode()}\n\n"
+                    yield "data: [DONE]\n\n"
+
+                return StreamingResponse(
+                    generate_cached(),
+                    media_type="text/event-stream",
+                    headers={
+                        "Cache-Control": "no-cache",
+                        "Connection": "keep-alive",
+                    },
+                )
+
         # If RAG is enabled, retrieve context and modify the latest message
         if request.use_rag:
-            doc_count = vector_db.count()
-
             if doc_count > 0:
                 logger.info("Retrieving RAG context...")
 
-                # Get top_k from request or use default
-                top_k = request.top_k or settings.rag_top_k
-
-                # Generate query embedding
-                query_embedding = embedding_model.encode_query(latest_message)
-
                 # Build where filter for category if specified
                 where_filter = None
                 if request.category:
                     where_filter = {"category": request.category}
                     logger.info(f"  Filtering by category: {request.category}")
 
+                # Over-fetch candidates so MMR can drop near-duplicate chunks
+                n_results = top_k
+                include = None
+                if settings.rag_mmr_enabled:
+                    n_results = top_k * settings.rag_mmr_fetch_factor
+                    include = ["embeddings", "documents", "metadatas", "distances"]
+
                 # Query vector database
                 results = vector_db.query(
                     query_embeddings=[query_embedding],
-                    n_results=top_k,
+                    n_results=n_results,
                     where=where_filter,
+                    include=include,
                 )
 
-                # Build context items
-                context_items = []
+                # Convert distances to similarities and filter in one pass
                 threshold = settings.rag_similarity_threshold
+                similarities = vector_db.similarities(results["distances"][0])
+                keep_idx = np.nonzero(similarities >= threshold)[0]
+
+                # Rerank surviving candidates for relevance and diversity
+                if settings.rag_mmr_enabled and keep_idx.size > 0:
+                    candidate_embeddings = np.asarray(
+                        results["embeddings"][0], dtype=np.float32
+                    )[keep_idx]
+                    selected = mmr_select(
+                        similarities[keep_idx],
+                        candidate_embeddings,
+                        k=top_k,
+                        lambda_mult=settings.rag_mmr_lambda,
+                    )
+                    keep_idx = keep_idx[selected]
 
-                for i in range(len(results["ids"][0])):
-                    document = results["documents"][0][i]
-                    metadata = results["metadatas"][0][i]
-                    distance = results["distances"][0][i]
-
-                    # Convert distance to similarity
-                    similarity = 1 - (distance ** 2 / 2)
-
-                    if similarity >= threshold:
-                        context_items.append({
-                            "content": document,
-                            "metadata": metadata,
-                            "score": similarity,
-                        })
+                # Build context items
+                context_items = [
+                    {
+                        "content": results["documents"][0][i],
+                        "metadata": results["metadatas"][0][i],
+                        "score": float(similarities[i]),
+                    }
+                    for i in keep_idx
+                ]
 
                 if context_items:
                     logger.info(f"  Retrieved {len(context_items)} context items")
@@ -105,20 +165,34 @@ async def chat_with_rag(request: ChatRequest):
 
         # Stream response from LLM
         async def generate():
+            response_parts = []
             try:
                 async for chunk in llm_client.chat_completion(
                     messages=messages,
                     stream=request.stream,
                 ):
+                    if use_cache:
+                        response_parts.append(orjson.loads(chunk)["content"])
+
                     # Format as SSE (Server-Sent Events)
                     yield f"data: {chunk}\n\n"
 
                 # Send done signal
                 yield "data: [DONE]\n\n"
 
+                if use_cache and response_parts:
+                    await run_in_threadpool(
+                        response_cache.store,
+                        query_embedding,
+                        "".join(response_parts),
+                        use_rag=request.use_rag,
+                        category=request.category,
+                        top_k=top_k,
+                    )
+
             except Exception as e:
                 logger.error(f"Error in streaming: {e}")
-                error_data = json.dumps({"error": str(e)})
+                error_data = orjson.dumps({"error": str(e)}).decode()
                 yield f"data: {error_data}\n\n"
 
         return StreamingResponse(
@@ -1,23 +1,210 @@
 """Document management API routes."""
 
+import asyncio
 import logging
-from typing import List
-from fastapi import APIRouter, UploadFile, File, HTTPException
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Literal, Optional, Tuple, Union
+
+import orjson
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
-from models import DocumentUploadResponse, DocumentListResponse
+from models import DocumentUploadResponse, DocumentListResponse, DocumentListResponseSoA
 from vectordb import vector_db
-from embeddings import embedding_model
+from batching import batcher
+from doc_index import doc_index
+from response_cache import response_cache
+from upload_worker import process_upload
 from text_processing import (
-    extract_text_from_file,
-    create_chunks_with_metadata,
-    clean_text,
+    load_original_content,
+    commit_original_content,
+    discard_original_content,
+    delete_original_content,
+    format_timestamp,
+    worker_budget,
+    set_pool_size,
 )
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Worker processes for CPU-bound upload parsing (PDF extraction, chunking);
+# embeddings stay in the main process so the model is loaded only once.
+# Created in the app lifespan, see start_upload_pool()
+pool: Optional[ProcessPoolExecutor] = None
+
+
+def start_upload_pool() -> None:
+    """Start the upload worker pool."""
+    global pool
+    # Spawn rather than fork: this process already runs torch, ChromaDB and
+    # event loop threads whose held locks a forked child would inherit
+    n_workers = worker_budget()
+    pool = ProcessPoolExecutor(
+        max_workers=n_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=set_pool_size,
+        initargs=(n_workers,),
+    )
+
+
+def stop_upload_pool() -> None:
+    """Shut down the upload worker pool, dropping queued jobs."""
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+
+
+def _spool_to_disk(upload: BinaryIO, suffix: str) -> Path:
+    """
+    Copy an upload to a temporary file that worker processes can open.
+
+    Args:
+        upload: Upload file object
+        suffix: File name suffix (extension)
+
+    Returns:
+        Path of the temporary file; the caller removes it
+    """
+    upload.seek(0)
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+        shutil.copyfileobj(upload, tmp, 1 << 20)
+    return Path(tmp.name)
+
+
+async def _index_text(
+    content: Union[str, Path],
+    filename: str,
+    file_type: str,
+    extra_meta: Optional[dict] = None,
+) -> Tuple[List[str], List[str]]:
+    """
+    Extract, clean, chunk, embed and store one document.
+
+    Args:
+        content: Document text, or the path of an uploaded file (parsed in
+            the worker)
+        filename: Filename to store the chunks under
+        file_type: File type
+        extra_meta: Optional metadata added to every chunk
+
+    Returns:
+        Tuple of (chunk_ids, chunks); both empty when the text is blank
+    """
+    loop = asyncio.get_running_loop()
+    chunk_ids, chunks, metadatas = await loop.run_in_executor(
+        pool, process_upload, content, filename, file_type
+    )
+
+    if not chunks:
+        return [], []
+
+    if extra_meta:
+        for m in metadatas:
+            m.update(extra_meta)
+
+    try:
+        # Generate embeddings for chunks
+        logger.info(f"Generating embeddings for {len(chunks)} chunks...")
+        embeddings = await batcher.submit(chunks)
+
+        # Add to vector database
+        vector_db.add_documents(
+            ids=chunk_ids,
+            documents=chunks,
+            embeddings=embeddings,
+            metadatas=metadatas,
+        )
+    except Exception:
+        # The worker staged the original text; keep no orphan behind
+        discard_original_content(filename)
+        raise
+
+    commit_original_content(filename)
+    doc_index.add_chunks(metadatas)
+    _invalidate_list_cache()
+    await run_in_threadpool(response_cache.clear)
+
+    return chunk_ids, chunks
+
+
+# list_documents results per category: (cached_at, documents)
+_LIST_CACHE_TTL = 30.0
+_list_cache: Dict[Optional[str], Tuple[float, List[Dict[str, Any]]]] = {}
+_list_cache_lock = threading.Lock()
+
+
+def _list_documents_cached(category: Optional[str]) -> List[Dict[str, Any]]:
+    """
+    Get document summaries, served from memory between changes.
+
+    Args:
+        category: Optional category filter
+
+    Returns:
+        Document summaries
+    """
+    now = time.monotonic()
+    with _list_cache_lock:
+        cached = _list_cache.get(category)
+        if cached is not None and now - cached[0] < _LIST_CACHE_TTL:
+            return cached[1]
+
+    documents = doc_index.list(category)
+    with _list_cache_lock:
+        _list_cache[category] = (now, documents)
+    return documents
+
+
+def _invalidate_list_cache() -> None:
+    """Drop cached document lists after the collection changes."""
+    with _list_cache_lock:
+        _list_cache.clear()
+
+
+# Flush streamed JSON in ~64 KiB pieces rather than one write per element
+_STREAM_FLUSH_BYTES = 64 * 1024
+
+
+def _stream_json(array_key: str, items: Iterable[Any], **fields: Any) -> StreamingResponse:
+    """
+    Stream a JSON object whose largest member is an array, element by element.
+
+    Args:
+        array_key: Key of the streamed array
+        items: Array elements (may be a lazy generator)
+        **fields: Other top-level fields, written before the array
+
+    Returns:
+        StreamingResponse producing `{**fields, array_key: [...items]}`
+    """
+    def body() -> Iterator[bytes]:
+        head = orjson.dumps(fields)[:-1]
+        if fields:
+            head += b","
+        buf = bytearray(head + orjson.dumps(array_key) + b":[")
+        sep = b""
+        for item in items:
+            buf += sep
+            buf += orjson.dumps(item)
+            sep = b","
+            if len(buf) >= _STREAM_FLUSH_BYTES:
+                yield bytes(buf)
+                buf.clear()
+        buf += b"]}"
+        yield bytes(buf)
+
+    return StreamingResponse(body(), media_type="application/json")
+
 
 class TextUploadRequest(BaseModel):
     """Text upload request model."""
@@ -41,41 +228,26 @@ async def upload_document(file: UploadFile = File(...)):
     try:
         logger.info(f"Uploading document: {file.filename}")
 
-        # Read file content
-        content = await file.read()
-
         # Determine file type
         file_type = file.content_type or file.filename.split(".")[-1]
 
-        # Extract text from file
-        text = extract_text_from_file(content, file_type, file.filename)
-        text = clean_text(text)
+        # Parse in a worker process so the event loop stays free. The
+        # spooled upload cannot cross the process boundary, so hand the
+        # worker a file on disk rather than the whole content in memory
+        path = await run_in_threadpool(
+            _spool_to_disk, file.file, os.path.splitext(file.filename)[1]
+        )
+        try:
+            chunk_ids, chunks = await _index_text(path, file.filename, file_type)
+        finally:
+            os.remove(path)
 
-        if not text.strip():
+        if not chunks:
             raise HTTPException(
                 status_code=400,
                 detail="Failed to extract text from file or file is empty"
             )
 
-        # Create chunks with metadata
-        chunk_ids, chunks, metadatas = create_chunks_with_metadata(
-            text=text,
-            filename=file.filename,
-            file_type=file_type,
-        )
-
-        # Generate embeddings for chunks
-        logger.info(f"Generating embeddings for {len(chunks)} chunks...")
-        embeddings = embedding_model.encode_documents(chunks)
-
-        # Add to vector database
-        vector_db.add_documents(
-            ids=chunk_ids,
-            documents=chunks,
-            embeddings=embeddings,
-            metadatas=metadatas,
-        )
-
         logger.info(
             f"Successfully uploaded {file.filename}: "
             f"{len(chunks)} chunks indexed"
@@ -109,37 +281,18 @@ async def upload_text(request: TextUploadRequest):
     try:
         logger.info(f"Uploading text as: {request.filename}")
 
-        text = clean_text(request.text)
-
-        if not text.strip():
-            raise HTTPException(
-                status_code=400,
-                detail="Text is empty"
-            )
-
         # Add .md extension if not present
         filename = request.filename
         if not filename.endswith(('.md', '.txt')):
             filename = f"{filename}.md"
 
-        # Create chunks with metadata
-        chunk_ids, chunks, metadatas = create_chunks_with_metadata(
-            text=text,
-            filename=filename,
-            file_type="markdown",
-        )
-
-        # Generate embeddings for chunks
-        logger.info(f"Generating embeddings for {len(chunks)} chunks...")
-        embeddings = embedding_model.encode_documents(chunks)
+        chunk_ids, chunks = await _index_text(request.text, filename, "markdown")
 
-        # Add to vector database
-        vector_db.add_documents(
-            ids=chunk_ids,
-            documents=chunks,
-            embeddings=embeddings,
-            metadatas=metadatas,
-        )
+        if not chunks:
+            raise HTTPException(
+                status_code=400,
+                detail="Text is empty"
+            )
 
         logger.info(
             f"Successfully uploaded text as {filename}: "
@@ -163,46 +316,39 @@ async def upload_text(request: TextUploadRequest):
         )
 
 
-@router.get("/list", response_model=DocumentListResponse)
-async def list_documents(category: str = None):
-    """Get list of all uploaded documents, optionally filtered by category."""
+@router.get(
+    "/list",
+    response_model=Union[DocumentListResponse, DocumentListResponseSoA],
+)
+async def list_documents(
+    category: str = None,
+    response_format: Literal["aos", "soa"] = Query(default="aos", alias="format"),
+):
+    """
+    Get list of all uploaded documents, optionally filtered by category.
+
+    `?format=soa` returns parallel arrays instead of one object per document,
+    which is smaller on the wire for large collections.
+    """
     try:
         logger.info(f"Listing documents (category: {category})...")
 
-        # Build where filter for category if specified
-        where_filter = None
-        if category:
-            where_filter = {"category": category}
-
-        # Get all documents from vector database
-        results = vector_db.get_all_documents(where=where_filter)
-
-        # Group chunks by filename
-        documents_map = {}
-        for i, doc_id in enumerate(results["ids"]):
-            metadata = results["metadatas"][i]
-            filename = metadata.get("filename", "unknown")
-
-            if filename not in documents_map:
-                documents_map[filename] = {
-                    "filename": filename,
-                    "file_type": metadata.get("file_type", "unknown"),
-                    "chunk_count": 0,
-                    "upload_timestamp": metadata.get("upload_timestamp", ""),
-                    "total_chars": 0,
-                }
-
-            documents_map[filename]["chunk_count"] += 1
-            documents_map[filename]["total_chars"] += metadata.get("char_count", 0)
-
-        documents = list(documents_map.values())
+        # Per-document aggregates are maintained in the sidecar index
+        documents = _list_documents_cached(category)
 
         logger.info(f"Found {len(documents)} unique documents")
 
-        return DocumentListResponse(
-            documents=documents,
-            total_count=len(documents),
-        )
+        if response_format == "soa":
+            return DocumentListResponseSoA(
+                filenames=[d["filename"] for d in documents],
+                file_types=[d["file_type"] for d in documents],
+                chunk_counts=[d["chunk_count"] for d in documents],
+                upload_timestamps=[d["upload_timestamp"] for d in documents],
+                total_chars=[d["total_chars"] for d in documents],
+                total_count=len(documents),
+            )
+
+        return _stream_json("documents", documents, total_count=len(documents))
 
     except Exception as e:
         logger.error(f"Failed to list documents: {e}")
@@ -218,46 +364,47 @@ async def get_document_content(filename: str):
     try:
         logger.info(f"Getting content for: {filename}")
 
-        # Get all documents from vector database
-        results = vector_db.get_all_documents()
+        # Let ChromaDB filter to this file's chunks instead of fetching them all
+        results = vector_db.get_all_documents(
+            where={"filename": filename},
+            include=["documents", "metadatas"],
+        )
 
-        # Filter chunks that match the filename
-        chunks = []
+        # Collect indexes of chunks; chunk dicts are built while streaming
+        matches = list(range(len(results["ids"])))
         original_content = None
-        for i, doc_id in enumerate(results["ids"]):
-            metadata = results["metadatas"][i]
-            if metadata.get("filename") == filename:
-                chunks.append({
-                    "chunk_index": metadata.get("chunk_index", 0),
-                    "content": results["documents"][i],
-                    "char_count": metadata.get("char_count", 0),
-                })
-                # Get original content from first chunk's metadata
-                if metadata.get("chunk_index", 0) == 0 and metadata.get("original_content"):
-                    original_content = metadata.get("original_content")
+        for metadata in results["metadatas"]:
+            # Get original content referenced by the first chunk's metadata
+            if metadata.get("chunk_index", 0) == 0:
+                original_content = load_original_content(metadata)
 
-        if not chunks:
+        if not matches:
             raise HTTPException(
                 status_code=404,
                 detail=f"Document not found: {filename}"
             )
 
         # Sort by chunk index
-        chunks.sort(key=lambda x: x["chunk_index"])
+        matches.sort(key=lambda i: results["metadatas"][i].get("chunk_index", 0))
 
-        logger.info(f"Retrieved {len(chunks)} chunks for {filename}")
+        logger.info(f"Retrieved {len(matches)} chunks for {filename}")
 
-        response = {
-            "filename": filename,
-            "total_chunks": len(chunks),
-            "chunks": chunks,
-        }
+        chunks = (
+            {
+                "chunk_index": results["metadatas"][i].get("chunk_index", 0),
+                "content": results["documents"][i],
+                "char_count": results["metadatas"][i].get("char_count", 0),
+            }
+            for i in matches
+        )
+
+        fields = {"filename": filename, "total_chunks": len(matches)}
 
         # Include original content if available (for editing)
         if original_content:
-            response["original_content"] = original_content
+            fields["original_content"] = original_content
 
-        return response
+        return _stream_json("chunks", chunks, **fields)
 
     except HTTPException:
         raise
@@ -277,6 +424,10 @@ async def delete_document(filename: str):
 
         # Delete all chunks for this filename
         deleted_count = vector_db.delete_by_filename(filename)
+        doc_index.remove_document(filename)
+        delete_original_content(filename)
+        _invalidate_list_cache()
+        await run_in_threadpool(response_cache.clear)
 
         if deleted_count == 0:
             raise HTTPException(
@@ -309,6 +460,10 @@ async def reset_collection():
         logger.warning("Resetting collection...")
 
         vector_db.reset()
+        doc_index.clear()
+        delete_original_content()
+        _invalidate_list_cache()
+        await run_in_threadpool(response_cache.clear)
 
         logger.info("Collection reset successfully")
 
@@ -350,41 +505,22 @@ async def create_document(request: DocumentCreateRequest):
     Simple API for adding text to RAG knowledge base.
     """
     try:
-        text = clean_text(request.content)
-
-        if not text.strip():
-            raise HTTPException(
-                status_code=400,
-                detail="Content is empty"
-            )
-
         title = request.metadata.get("title", "Untitled")
         category = request.metadata.get("category", "general")
         filename = f"{title}.md"
 
-        # Create chunks with metadata
-        chunk_ids, chunks, metadatas = create_chunks_with_metadata(
-            text=text,
-            filename=filename,
-            file_type="markdown",
+        chunk_ids, chunks = await _index_text(
+            request.content,
+            filename,
+            "markdown",
+            extra_meta={"category": category, "title": title},
         )
 
-        # Add category to metadata
-        for m in metadatas:
-            m["category"] = category
-            m["title"] = title
-
-        # Generate embeddings for chunks
-        logger.info(f"Generating embeddings for {len(chunks)} chunks...")
-        embeddings = embedding_model.encode_documents(chunks)
-
-        # Add to vector database
-        vector_db.add_documents(
-            ids=chunk_ids,
-            documents=chunks,
-            embeddings=embeddings,
-            metadatas=metadatas,
-        )
+        if not chunks:
+            raise HTTPException(
+                status_code=400,
+                detail="Content is empty"
+            )
 
         logger.info(f"Created document '{title}': {len(chunks)} chunks")
 
@@ -415,24 +551,22 @@ async def get_documents():
     try:
         results = vector_db.get_all_documents()
 
-        documents = []
-        for i, doc_id in enumerate(results["ids"]):
-            metadata = results["metadatas"][i]
-            documents.append({
-                "id": doc_id,
-                "content": results["documents"][i][:200] + "..." if len(results["documents"][i]) > 200 else results["documents"][i],
-                "metadata": {
-                    "title": metadata.get("title", metadata.get("filename", "Untitled")),
-                    "category": metadata.get("category", ""),
-                    "filename": metadata.get("filename", ""),
-                },
-                "created_at": metadata.get("upload_timestamp", ""),
-            })
+        def iter_documents():
+            for doc_id, content, metadata in zip(
+                results["ids"], results["documents"], results["metadatas"]
+            ):
+                yield {
+                    "id": doc_id,
+                    "content": content[:200] + "..." if len(content) > 200 else content,
+                    "metadata": {
+                        "title": metadata.get("title", metadata.get("filename", "Untitled")),
+                        "category": metadata.get("category", ""),
+                        "filename": metadata.get("filename", ""),
+                    },
+                    "created_at": format_timestamp(metadata.get("upload_timestamp", "")),
+                }
 
-        return {
-            "documents": documents,
-            "total": len(documents),
-        }
+        return _stream_json("documents", iter_documents(), total=len(results["ids"]))
 
     except Exception as e:
         logger.error(f"Failed to get documents: {e}")
@@ -449,7 +583,26 @@ async def delete_document_by_id(doc_id: str):
         logger.info(f"Deleting document by ID: {doc_id}")
 
         # Delete the specific document
+        existing = vector_db.get_documents([doc_id], include=["metadatas"])
+        if not existing["ids"]:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Document not found: {doc_id}"
+            )
+
         vector_db.delete_documents([doc_id])
+        doc_index.remove_chunks(existing["metadatas"] or [])
+
+        # Drop the stored original once nothing references it
+        for metadata in existing["metadatas"] or []:
+            filename = metadata.get("filename", "")
+            remaining = vector_db.get_all_documents(
+                where={"filename": filename}, include=[]
+            )
+            if metadata.get("original_path") or not remaining["ids"]:
+                delete_original_content(filename)
+        _invalidate_list_cache()
+        await run_in_threadpool(response_cache.clear)
 
         logger.info(f"Deleted document: {doc_id}")
 
@@ -458,6 +611,8 @@ async def delete_document_by_id(doc_id: str):
             "message": f"Document deleted successfully",
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to delete document: {e}")
         raise HTTPException(
@@ -1,27 +1,66 @@
 """LLM generation routes with Server-Sent Events streaming."""
 
-import json
 import logging
+import re
 from typing import Optional
 
 import httpx
+import orjson
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from config import settings
+from llm import llm_client
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
+def _sse(data: dict) -> bytes:
+    """Encode a dict as one Server-Sent Events frame."""
+    return b"data: " + orjson.dumps(data) + b"\n\n"
+
+
+# Final frame sent when the upstream stream completes
+_SSE_DONE = _sse({"done": True})
+
+# Upstream (OpenAI-compatible) end-of-stream sentinel
+_UPSTREAM_DONE = b"data: [DONE]"
+
+
+def _sentinel_prefix_len(data: bytes) -> int:
+    """Length of the longest suffix of data that starts the upstream sentinel."""
+    for n in range(min(len(_UPSTREAM_DONE) - 1, len(data)), 0, -1):
+        if data.endswith(_UPSTREAM_DONE[:n]):
+            return n
+    return 0
+
+
+# Single-pass prettification of Gemma model filenames
+_MODEL_NAME_RE = re.compile(r"google[-_]|gemma|[-_]3n|[-_]E4B|[-_]it")
+_MODEL_NAME_MAP = {
+    "google-": "Google ",
+    "google_": "Google ",
+    "gemma": "Gemma",
+    "-3n": " 3n",
+    "_3n": " 3n",
+    "-E4B": " E4B",
+    "_E4B": " E4B",
+    "-it": " Instruct",
+    "_it": " Instruct",
+}
+
+
 class GenerateRequest(BaseModel):
     """Request model for LLM generation."""
 
     prompt: str
     systemPrompt: Optional[str] = None
     options: Optional[dict] = None
+    # Forward upstream chunk frames as-is instead of re-encoding {"content": ...}
+    passthrough: bool = False
 
 
 class ModelInfo(BaseModel):
@@ -38,10 +77,10 @@ class ModelInfo(BaseModel):
 async def get_model_info():
     """Get information about the currently loaded LLM model."""
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(f"{settings.llm_base_url}/v1/models")
-            response.raise_for_status()
-            data = response.json()
+        client = await llm_client.get_client()
+        response = await client.get(f"{settings.llm_base_url}/v1/models", timeout=10.0)
+        response.raise_for_status()
+        data = response.json()
 
         model = data.get("data", [{}])[0] if data.get("data") else {}
 
@@ -58,16 +97,8 @@ async def get_model_info():
             parts = model_name.split("_")
             last_parts = parts[-3:] if len(parts) >= 3 else parts
             combined = "_".join(last_parts)
-            model_name = (
-                combined.replace("google-", "Google ")
-                .replace("google_", "Google ")
-                .replace("gemma", "Gemma")
-                .replace("-3n", " 3n")
-                .replace("_3n", " 3n")
-                .replace("-E4B", " E4B")
-                .replace("_E4B", " E4B")
-                .replace("-it", " Instruct")
-                .replace("_it", " Instruct")
+            model_name = _MODEL_NAME_RE.sub(
+                lambda m: _MODEL_NAME_MAP[m.group(0)], combined
             )
 
         params = model.get("meta", {}).get("n_params", 0)
@@ -91,7 +122,13 @@ async def get_model_info():
 
 @router.post("/generate")
 async def generate_text(request: GenerateRequest):
-    """Generate text using LLM with Server-Sent Events streaming."""
+    """
+    Generate text using LLM with Server-Sent Events streaming.
+
+    Frames are `{"content": ...}` per token by default; with `passthrough`
+    the upstream `{"choices": [{"delta": {"content": ...}}]}` frames are
+    forwarded verbatim. Both end with a `{"done": true}` frame.
+    """
 
     async def stream_generator():
         """Generator that streams LLM output as SSE."""
@@ -118,49 +155,79 @@ async def generate_text(request: GenerateRequest):
 
             logger.info(f"Starting LLM generation stream to {settings.llm_base_url}")
 
-            async with httpx.AsyncClient(timeout=120.0) as client:
-                async with client.stream(
-                    "POST",
-                    f"{settings.llm_base_url}/v1/chat/completions",
-                    json=body,
-                    headers={"Content-Type": "application/json"},
-                ) as response:
-                    if response.status_code != 200:
-                        error_text = await response.aread()
-                        logger.error(f"LLM error: {response.status_code} - {error_text}")
-                        yield f"data: {json.dumps({'error': f'LLM error: {response.status_code}'})}\n\n"
-                        return
-
-                    async for line in response.aiter_lines():
-                        if not line:
-                            continue
+            client = await llm_client.get_client()
+            async with client.stream(
+                "POST",
+                f"{settings.llm_base_url}/v1/chat/completions",
+                json=body,
+                headers={"Content-Type": "application/json"},
+            ) as response:
+                if response.status_code != 200:
+                    error_text = await response.aread()
+                    logger.error(f"LLM error: {response.status_code} - {error_text}")
+                    yield _sse({"error": f"LLM error: {response.status_code}"})
+                    return
+
+                if request.passthrough:
+                    # Forward upstream bytes verbatim; only the [DONE] sentinel is
+                    # replaced, holding back a partial sentinel split across reads
+                    pending = b""
+                    async for raw in response.aiter_bytes():
+                        data = pending + raw if pending else raw
+                        done = data.find(_UPSTREAM_DONE)
+                        if done != -1:
+                            if done:
+                                yield data[:done]
+                            yield _SSE_DONE
+                            return
+
+                        keep = _sentinel_prefix_len(data)
+                        pending = data[len(data) - keep:] if keep else b""
+                        if len(data) > keep:
+                            yield data[:len(data) - keep]
+
+                    if pending:
+                        yield pending
+                    return
+
+                # Parse SSE on raw bytes: split on newlines in a buffer and only
+                # JSON-decode the payload, skipping per-line UTF-8 decoding
+                buffer = bytearray()
+                async for raw in response.aiter_bytes():
+                    buffer += raw
+
+                    while (newline := buffer.find(b"\n")) != -1:
+                        line = bytes(buffer[:newline]).rstrip(b"\r")
+                        del buffer[:newline + 1]
 
                         # Handle SSE format from llama.cpp
-                        if line.startswith("data: "):
-                            data = line[6:]  # Remove "data: " prefix
-
-                            if data == "[DONE]":
-                                yield f"data: {json.dumps({'done': True})}\n\n"
-                                break
-
-                            try:
-                                chunk = json.loads(data)
-                                content = (
-                                    chunk.get("choices", [{}])[0]
-                                    .get("delta", {})
-                                    .get("content", "")
-                                )
-                                if content:
-                                    yield f"data: {json.dumps({'content': content})}\n\n"
-                            except json.JSONDecodeError:
-                                continue
+                        if not line.startswith(b"data: "):
+                            continue
+
+                        payload = line[6:]  # Skip "data: " prefix
+
+                        if payload == b"[DONE]":
+                            yield _SSE_DONE
+                            return
+
+                        try:
+                            chunk = orjson.loads(payload)
+                            content = (
+                                chunk.get("choices", [{}])[0]
+                                .get("delta", {})
+                                .get("content", "")
+                            )
+                            if content:
+                                yield _sse({"content": content})
+                        except orjson.JSONDecodeError:
+                            continue
 
         except httpx.HTTPError as e:
             logger.error(f"HTTP error during streaming: {e}")
-            yield f"data: {json.dumps({'error': f'Connection error: {e}'})}\n\n"
+            yield _sse({"error": f"Connection error: {e}"})
         except Exception as e:
             logger.error(f"Error during streaming: {e}")
-            yield f"data: {json.dumps({'error': str(e)})}\n\n"
+            yield _sse({"error": str(e)})
 
     return StreamingResponse(
         stream_generator(),
@@ -196,14 +263,14 @@ async def generate_text_sync(request: GenerateRequest):
             "stream": False,
         }
 
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            response = await client.post(
-                f"{settings.llm_base_url}/v1/chat/completions",
-                json=body,
-                headers={"Content-Type": "application/json"},
-            )
-            response.raise_for_status()
-            data = response.json()
+        client = await llm_client.get_client()
+        response = await client.post(
+            f"{settings.llm_base_url}/v1/chat/completions",
+            json=body,
+            headers={"Content-Type": "application/json"},
+        )
+        response.raise_for_status()
+        data = response.json()
 
         content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
 
@@ -1,11 +1,13 @@
 """RAG (Retrieval-Augmented Generation) API routes."""
 
 import logging
+import numpy as np
 from fastapi import APIRouter, HTTPException
 
 from models import RAGQueryRequest, RAGQueryResponse, ContextItem
 from vectordb import vector_db
 from embeddings import embedding_model
+from batching import batcher
 from config import settings
 
 logger = logging.getLogger(__name__)
@@ -51,32 +53,28 @@ async def query_rag(request: RAGQueryRequest):
             n_results=top_k,
         )
 
-        # Process results
-        context_items = []
-        for i in range(len(results["ids"][0])):
-            doc_id = results["ids"][0][i]
-            document = results["documents"][0][i]
-            metadata = results["metadatas"][0][i]
-            distance = results["distances"][0][i]
-
-            # Convert distance to similarity score (cosine similarity)
-            # ChromaDB returns L2 distance for normalized vectors
-            # similarity = 1 - (distance^2 / 2)
-            similarity = 1 - (distance ** 2 / 2)
-
-            # Filter by threshold
-            if similarity >= threshold:
-                context_items.append(
-                    ContextItem(
-                        content=document,
-                        metadata=metadata,
-                        score=round(similarity, 4),
-                    )
-                )
+        # Convert distance to similarity score (cosine similarity) in one pass
+        # Cosine-space collections return 1 - cosine as the distance
+        similarities = vector_db.similarities(results["distances"][0])
+
+        # Filter by threshold; hits come back nearest first, at most top_k
+        keep_idx = np.nonzero(similarities >= threshold)[0]
+
+        context_items = [
+            ContextItem(
+                content=results["documents"][0][i],
+                metadata=results["metadatas"][0][i],
+                score=round(float(similarities[i]), 4),
+            )
+            for i in keep_idx
+        ]
+
+        if logger.isEnabledFor(logging.DEBUG):
+            for item in context_items:
                 logger.debug(
-                    f"  {metadata.get('filename', 'unknown')} "
-                    f"(chunk {metadata.get('chunk_index', '?')}) "
-                    f"- score: {similarity:.4f}"
+                    f"  {item.metadata.get('filename', 'unknown')} "
+                    f"(chunk {item.metadata.get('chunk_index', '?')}) "
+                    f"- score: {item.score:.4f}"
                 )
 
         logger.info(
@@ -105,7 +103,7 @@ async def get_rag_stats():
         total_chunks = vector_db.count()
 
         # Get unique documents count
-        results = vector_db.get_all_documents()
+        results = vector_db.get_all_documents(include=["metadatas"])
         unique_files = set()
         if results["metadatas"]:
             unique_files = {
@@ -122,6 +120,7 @@ async def get_rag_stats():
             "chunk_overlap": settings.chunk_overlap,
             "top_k": settings.rag_top_k,
             "similarity_threshold": settings.rag_similarity_threshold,
+            "embedding_batcher": batcher.get_stats(),
         }
 
     except Exception as e:
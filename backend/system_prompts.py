@@ -21,13 +21,27 @@ DEFAULT_SYSTEM_PROMPT = """あなたは人事評価のアドバイザーです
 参考資料が提供された場合は、その内容を踏まえて回答してください。"""
 
 
+# Parsed system prompt cache, keyed by the settings file's
+# (mtime, size, inode), or None when there is no file. The inode changes on
+# every atomic-rename save, even within the filesystem's mtime granularity
+_cache = {"key": (), "prompt": DEFAULT_SYSTEM_PROMPT}
+
+
 def get_system_prompt() -> str:
     """Get the current system prompt from settings or return default."""
     try:
+        key = None
         if SETTINGS_FILE.exists():
-            with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
-                settings = json.load(f)
-                return settings.get("system_prompt", DEFAULT_SYSTEM_PROMPT)
+            st = SETTINGS_FILE.stat()
+            key = (st.st_mtime_ns, st.st_size, st.st_ino)
+        if key != _cache["key"]:
+            prompt = DEFAULT_SYSTEM_PROMPT
+            if key:
+                with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
+                    settings = json.load(f)
+                    prompt = settings.get("system_prompt", DEFAULT_SYSTEM_PROMPT)
+            _cache.update(key=key, prompt=prompt)
+        return _cache["prompt"]
     except Exception as e:
         logger.warning(f"Failed to load system prompt from settings: {e}")
 
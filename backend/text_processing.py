@@ -2,28 +2,221 @@
 
 import logging
 import hashlib
-from typing import List, Dict, Any
+import multiprocessing
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Iterator, Optional, Tuple, Union, BinaryIO
 from datetime import datetime
 import re
 
+import orjson
+
+try:
+    import blake3
+except ImportError:
+    # Fall back to xxhash, then hashlib's BLAKE2b
+    blake3 = None
+    try:
+        import xxhash
+    except ImportError:
+        xxhash = None
+
 from config import settings
 
 logger = logging.getLogger(__name__)
 
+# clean_text patterns, compiled once
+_WS_RUN = re.compile(r"[^\S\n]+")
+_NL_RUN = re.compile(r"\n{3,}")
+_LINE_TRIM = re.compile(r"[^\S\n]*\n[^\S\n]*")
+
+# PDFs with at least this many pages are extracted in parallel processes
+PDF_PARALLEL_THRESHOLD = 50
+
+# Processes of the pool this process is a worker of (1 outside a pool);
+# nested PDF pools get only this process's share of worker_budget()
+_pool_size = 1
+
+# File types read as plain UTF-8 text
+TEXT_FILE_TYPES = ("text/plain", ".txt", ".md", ".markdown")
+
+# Sentence-ending characters preferred as chunk boundaries
+_BOUNDARY_RE = re.compile(r"[。.!?\n]")
+
+
+def worker_budget() -> int:
+    """
+    Number of CPU-bound worker processes one server process may run.
+
+    Cores are shared between uvicorn workers, like the BLAS thread cap.
+
+    Returns:
+        Worker count (at least 1)
+    """
+    return max(1, (os.cpu_count() or 1) // max(1, settings.backend_workers))
+
+
+def set_pool_size(n_workers: int) -> None:
+    """
+    Record that this process is one of n_workers pool worker processes.
+
+    Args:
+        n_workers: Size of the pool this process belongs to
+    """
+    global _pool_size
+    _pool_size = max(1, n_workers)
+
+
+def _hash_id(content: str) -> str:
+    """Hash an ID string to 128 bits of hex with the fastest available hasher."""
+    data = content.encode()
+    if blake3 is not None:
+        return blake3.blake3(data).hexdigest(length=16)
+    if xxhash is not None:
+        return xxhash.xxh128_hexdigest(data)
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _originals_dir() -> str:
+    """Directory holding each document's original text, beside ChromaDB."""
+    return os.path.join(os.path.abspath(settings.chroma_persist_dir), "originals")
+
+
+def _original_name(filename: str) -> str:
+    """File name of a document's stored original text."""
+    return f"{hashlib.blake2b(filename.encode(), digest_size=16).hexdigest()}.txt"
+
+
+def stage_original_content(filename: str, text: str) -> str:
+    """
+    Write a document's original text to a pending file outside ChromaDB.
+
+    The file only replaces the stored original once indexing succeeds, see
+    commit_original_content() and discard_original_content().
+
+    Args:
+        filename: Source filename (one stored original per filename)
+        text: Original document text
+
+    Returns:
+        Path the original is stored at once committed, relative to the
+        originals directory
+    """
+    name = _original_name(filename)
+    directory = _originals_dir()
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, f"{name}.pending"), "w", encoding="utf-8") as f:
+        f.write(text)
+    return name
+
+
+def commit_original_content(filename: str) -> None:
+    """
+    Make a document's staged original text the stored one.
+
+    Args:
+        filename: Source filename
+    """
+    path = os.path.join(_originals_dir(), _original_name(filename))
+    try:
+        os.replace(f"{path}.pending", path)
+    except FileNotFoundError:
+        pass
+
+
+def discard_original_content(filename: str) -> None:
+    """
+    Drop a document's staged original text after indexing failed.
+
+    Args:
+        filename: Source filename
+    """
+    try:
+        os.remove(os.path.join(_originals_dir(), f"{_original_name(filename)}.pending"))
+    except FileNotFoundError:
+        pass
+
+
+def load_original_content(metadata: Dict[str, Any]) -> Optional[str]:
+    """
+    Load the original text referenced by a first chunk's metadata.
 
-def create_document_id(filename: str, chunk_index: int) -> str:
+    Args:
+        metadata: Chunk metadata
+
+    Returns:
+        Original text, or None if the chunk has none
+    """
+    name = metadata.get("original_path")
+    if not name:
+        # Documents indexed before the side store kept it inline
+        return metadata.get("original_content")
+    try:
+        with open(os.path.join(_originals_dir(), name), encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        logger.warning(f"Original content file missing: {name}")
+        return None
+
+
+def delete_original_content(filename: Optional[str] = None) -> None:
+    """
+    Delete a document's stored original text.
+
+    Args:
+        filename: Source filename, or None to delete every stored original
+    """
+    if filename is None:
+        shutil.rmtree(_originals_dir(), ignore_errors=True)
+        return
+    try:
+        os.remove(os.path.join(_originals_dir(), _original_name(filename)))
+    except FileNotFoundError:
+        pass
+    discard_original_content(filename)
+
+
+def format_timestamp(timestamp: Union[int, float, str]) -> str:
+    """
+    Format an upload timestamp as an ISO 8601 string.
+
+    Args:
+        timestamp: Unix epoch seconds, or an ISO string from older documents
+
+    Returns:
+        ISO 8601 timestamp ("" when missing)
+    """
+    if isinstance(timestamp, str):
+        if not timestamp.isdigit():
+            return timestamp
+        timestamp = int(timestamp)
+    return datetime.fromtimestamp(timestamp).isoformat()
+
+
+def create_document_id(
+    filename: str,
+    chunk_index: int,
+    timestamp: Optional[Union[int, str]] = None,
+) -> str:
     """
     Create a unique document ID.
 
     Args:
         filename: Source filename
         chunk_index: Chunk index
+        timestamp: Upload time shared by the document's chunks, hashed into
+            the ID. An int may be epoch seconds or a finer value such as
+            time.time_ns(); a str is an ISO timestamp from older callers.
+            Defaults to time.time_ns()
 
     Returns:
         Unique document ID
     """
-    content = f"{filename}_{chunk_index}_{datetime.now().isoformat()}"
-    return hashlib.md5(content.encode()).hexdigest()
+    if timestamp is None:
+        timestamp = time.time_ns()
+    return _hash_id(f"{filename}_{chunk_index}_{timestamp}")
 
 
 def split_text_into_chunks(
@@ -50,44 +243,270 @@ def split_text_into_chunks(
     if len(text) <= chunk_size:
         return [text]
 
-    chunks = []
+    # Pass 1: offsets just past every sentence ending, found in one scan
+    boundaries = [m.end() for m in _BOUNDARY_RE.finditer(text)]
+
+    # Pass 2: pack spans with index math only; `hi` is a cursor so that
+    # boundaries[:hi] <= end, moved a few steps per chunk instead of searched
+    spans = []
     start = 0
+    hi = 0
+    text_len = len(text)
 
-    while start < len(text):
-        end = start + chunk_size
+    while start < text_len:
+        end = min(start + chunk_size, text_len)
 
         # If not the last chunk, try to break at sentence boundary
-        if end < len(text):
+        if end < text_len:
             # Look for sentence endings in the last 20% of the chunk
             search_start = int(end - chunk_size * 0.2)
-            sentence_end = max(
-                text.rfind("。", search_start, end),
-                text.rfind(".", search_start, end),
-                text.rfind("!", search_start, end),
-                text.rfind("?", search_start, end),
-                text.rfind("\n", search_start, end),
-            )
+            while hi < len(boundaries) and boundaries[hi] <= end:
+                hi += 1
+            while hi > 0 and boundaries[hi - 1] > end:
+                hi -= 1
 
-            if sentence_end > start:
-                end = sentence_end + 1
+            if hi > 0 and boundaries[hi - 1] > search_start and boundaries[hi - 1] > start + 1:
+                end = boundaries[hi - 1]
 
-        chunk = text[start:end].strip()
-        if chunk:
-            chunks.append(chunk)
+        spans.append((start, end))
 
         # Move to next chunk with overlap
-        start = end - chunk_overlap if end < len(text) else end
+        start = end - chunk_overlap if end < text_len else end
+
+    # Trim whitespace by moving the span bounds, so each chunk is sliced once
+    chunks = []
+    for start, end in spans:
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if end > start:
+            chunks.append(text[start:end])
 
     logger.debug(f"Split text into {len(chunks)} chunks")
     return chunks
 
 
-def extract_text_from_file(file_content: bytes, file_type: str, filename: str) -> str:
+def split_text_fast(
+    text: str,
+    chunk_size: int = None,
+) -> List[Tuple[str, int, int]]:
+    """
+    Split text with chonkie's SIMD-accelerated FastChunker.
+
+    Boundaries are found on the UTF-8 bytes, so this is much faster than
+    `split_text_into_chunks` on large documents, but it produces no overlap
+    and only splits on single-byte delimiters (newlines and ASCII
+    punctuation, not "。").
+
+    Args:
+        text: Text to split
+        chunk_size: Maximum chunk size in characters
+
+    Returns:
+        List of (chunk, start_index, end_index) tuples, where
+        text[start_index:end_index] == chunk (character offsets)
+    """
+    try:
+        from chonkie import FastChunker
+    except ImportError as e:
+        raise RuntimeError(
+            "chunker_backend 'fast' requires chonkie (pip install chonkie)"
+        ) from e
+
+    if chunk_size is None:
+        chunk_size = settings.chunk_size
+
+    # FastChunker sizes chunks in UTF-8 bytes; scale the character budget by
+    # this text's bytes per character (1 for ASCII, about 3 for Japanese)
+    n_bytes = len(text.encode("utf-8"))
+    chunker = FastChunker(
+        chunk_size=max(1, n_bytes * chunk_size // max(1, len(text))),
+        delimiters="\n.?!",
+    )
+
+    chunks = []
+    for chunk in chunker.chunk(text):
+        span_start, span_end = chunk.start_index, chunk.end_index
+        # Mixed-script text can still overshoot; hard-cut to chunk_size chars
+        for start in range(span_start, span_end, chunk_size):
+            end = min(start + chunk_size, span_end)
+            # Trim by moving the bounds so offsets match the chunk content
+            while start < end and text[start].isspace():
+                start += 1
+            while end > start and text[end - 1].isspace():
+                end -= 1
+            if end > start:
+                chunks.append((text[start:end], start, end))
+
+    logger.debug(f"Split text into {len(chunks)} chunks (fast)")
+    return chunks
+
+
+def _read_bytes(file_content: Union[bytes, BinaryIO]) -> bytes:
+    """Return raw bytes from either a bytes object or a binary file object."""
+    if isinstance(file_content, (bytes, bytearray)):
+        return bytes(file_content)
+    file_content.seek(0)
+    return file_content.read()
+
+
+def _iter_pdfium_pages(file_content: Union[bytes, BinaryIO]) -> Iterator[str]:
+    """
+    Yield PDF page texts extracted with PDFium (pypdfium2).
+
+    Args:
+        file_content: PDF as bytes or a seekable binary file object
+
+    Yields:
+        "[Page N]" headed page texts, in page order
+    """
+    import pypdfium2 as pdfium
+
+    if not isinstance(file_content, (bytes, bytearray)):
+        file_content.seek(0)
+    pdf = pdfium.PdfDocument(file_content)
+    try:
+        for page_num in range(len(pdf)):
+            page = pdf[page_num]
+            textpage = page.get_textpage()
+            try:
+                text = textpage.get_text_range()
+            finally:
+                textpage.close()
+                page.close()
+            if text.strip():
+                yield f"[Page {page_num + 1}]\n{text}"
+    finally:
+        pdf.close()
+
+
+def _iter_pymupdf_pages(file_content: Union[bytes, BinaryIO]) -> Iterator[str]:
+    """
+    Yield PDF page texts extracted with MuPDF (PyMuPDF).
+
+    Uses plain "text" extraction without layout reconstruction, and does not
+    insert spaces for glyph gaps (which would split Japanese words).
+
+    Args:
+        file_content: PDF as bytes or a seekable binary file object
+
+    Yields:
+        "[Page N]" headed page texts, in page order
+    """
+    try:
+        import fitz
+    except ImportError as e:
+        raise RuntimeError(
+            "pdf_parser 'pymupdf' requires PyMuPDF (pip install pymupdf)"
+        ) from e
+
+    # Extend (not replace) the default "text" flags, which keep ligatures
+    # and whitespace as the other parsers do
+    flags = fitz.TEXTFLAGS_TEXT | fitz.TEXT_INHIBIT_SPACES
+
+    path = getattr(file_content, "name", None)
+    if isinstance(path, str) and os.path.isfile(path):
+        # Let MuPDF read the file itself instead of loading it into memory
+        doc = fitz.open(path, filetype="pdf")
+    else:
+        doc = fitz.open(stream=_read_bytes(file_content), filetype="pdf")
+    try:
+        for page_num, page in enumerate(doc):
+            text = page.get_text("text", flags=flags)
+            if text.strip():
+                yield f"[Page {page_num + 1}]\n{text}"
+    finally:
+        doc.close()
+
+
+def _extract_page_range(args: Tuple[bytes, int, int]) -> List[str]:
+    """
+    Extract the text of a page range (runs in a worker process).
+
+    pypdf objects do not pickle, so each worker opens its own reader.
+
+    Args:
+        args: (pdf_bytes, start_page, stop_page)
+
+    Returns:
+        Raw page texts for pages start_page..stop_page-1
+    """
+    from pypdf import PdfReader
+    from io import BytesIO
+
+    pdf_bytes, start, stop = args
+    reader = PdfReader(BytesIO(pdf_bytes))
+    return [reader.pages[i].extract_text() for i in range(start, stop)]
+
+
+def _iter_pdf_pages(file_content: Union[bytes, BinaryIO]) -> Iterator[str]:
+    """
+    Yield the text of each non-empty PDF page, prefixed with its page number.
+
+    PDFs with at least PDF_PARALLEL_THRESHOLD pages are split into page
+    ranges extracted in parallel worker processes, within this process's
+    share of worker_budget() (so inside a full upload pool, sequentially).
+
+    Args:
+        file_content: PDF as bytes or a seekable binary file object
+
+    Yields:
+        "[Page N]" headed page texts, in page order
+    """
+    from pypdf import PdfReader
+    from io import BytesIO
+
+    if isinstance(file_content, (bytes, bytearray)):
+        pdf_file = BytesIO(file_content)
+    else:
+        pdf_file = file_content
+        pdf_file.seek(0)
+    reader = PdfReader(pdf_file)
+    n_pages = len(reader.pages)
+    # Inside the upload pool, keep outer x inner workers within the budget
+    workers = min(worker_budget() // _pool_size, n_pages)
+
+    if n_pages >= PDF_PARALLEL_THRESHOLD and workers > 1:
+        pdf_bytes = _read_bytes(file_content)
+        step = -(-n_pages // workers)
+        ranges = [
+            (pdf_bytes, start, min(start + step, n_pages))
+            for start in range(0, n_pages, step)
+        ]
+        logger.info(f"Extracting {n_pages} PDF pages in {len(ranges)} processes")
+
+        with ProcessPoolExecutor(
+            max_workers=len(ranges),
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as executor:
+            page_texts = (
+                text
+                for texts in executor.map(_extract_page_range, ranges)
+                for text in texts
+            )
+            for page_num, text in enumerate(page_texts):
+                if text.strip():
+                    yield f"[Page {page_num + 1}]\n{text}"
+        return
+
+    for page_num, page in enumerate(reader.pages):
+        text = page.extract_text()
+        if text.strip():
+            yield f"[Page {page_num + 1}]\n{text}"
+
+
+def extract_text_from_file(
+    file_content: Union[bytes, BinaryIO],
+    file_type: str,
+    filename: str,
+) -> str:
     """
     Extract text from file content based on file type.
 
     Args:
-        file_content: File content as bytes
+        file_content: File content as bytes or a seekable binary file object
+            (PDFs are parsed straight from the file without loading it)
         file_type: File MIME type or extension
         filename: Original filename
 
@@ -96,32 +515,39 @@ def extract_text_from_file(file_content: bytes, file_type: str, filename: str) -
     """
     try:
         # Text files
-        if file_type in ["text/plain", ".txt", ".md", ".markdown"]:
-            return file_content.decode("utf-8", errors="ignore")
+        if file_type in TEXT_FILE_TYPES:
+            return _read_bytes(file_content).decode("utf-8", errors="ignore")
 
         # JSON files
         elif file_type in ["application/json", ".json"]:
-            import json
-            data = json.loads(file_content.decode("utf-8"))
-            # Convert JSON to readable text
-            return json.dumps(data, indent=2, ensure_ascii=False)
+            raw = _read_bytes(file_content)
+            try:
+                # Convert JSON to readable text (orjson writes UTF-8 directly)
+                return orjson.dumps(
+                    orjson.loads(raw), option=orjson.OPT_INDENT_2
+                ).decode("utf-8")
+            except orjson.JSONDecodeError:
+                # Beyond orjson's grammar (NaN, integers over 64 bits)
+                import json
+                data = json.loads(raw.decode("utf-8"))
+                return json.dumps(data, indent=2, ensure_ascii=False)
 
         # PDF files
         elif file_type in ["application/pdf", ".pdf"]:
             try:
-                from pypdf import PdfReader
-                from io import BytesIO
-
-                pdf_file = BytesIO(file_content)
-                reader = PdfReader(pdf_file)
-
-                text_parts = []
-                for page_num, page in enumerate(reader.pages):
-                    text = page.extract_text()
-                    if text.strip():
-                        text_parts.append(f"[Page {page_num + 1}]\n{text}")
-
-                return "\n\n".join(text_parts)
+                if settings.pdf_parser == "pypdf":
+                    return "\n\n".join(_iter_pdf_pages(file_content))
+
+                if settings.pdf_parser == "pymupdf":
+                    name, iter_pages = "PyMuPDF", _iter_pymupdf_pages
+                else:
+                    name, iter_pages = "PDFium", _iter_pdfium_pages
+                try:
+                    return "\n\n".join(iter_pages(file_content))
+                except Exception as e:
+                    # Some documents extract better (or only) with pypdf
+                    logger.warning(f"{name} extraction failed, falling back to pypdf: {e}")
+                    return "\n\n".join(_iter_pdf_pages(file_content))
 
             except Exception as e:
                 logger.warning(f"Failed to extract PDF text: {e}")
@@ -129,7 +555,7 @@ def extract_text_from_file(file_content: bytes, file_type: str, filename: str) -
 
         else:
             logger.warning(f"Unsupported file type: {file_type}")
-            return file_content.decode("utf-8", errors="ignore")
+            return _read_bytes(file_content).decode("utf-8", errors="ignore")
 
     except Exception as e:
         logger.error(f"Failed to extract text from file: {e}")
@@ -152,30 +578,41 @@ def create_chunks_with_metadata(
     Returns:
         Tuple of (chunk_ids, chunks, metadatas)
     """
-    chunks = split_text_into_chunks(text)
-    timestamp = datetime.now().isoformat()
-
-    chunk_ids = []
-    metadatas = []
-
-    for i, chunk in enumerate(chunks):
-        chunk_id = create_document_id(filename, i)
-        chunk_ids.append(chunk_id)
-
-        metadata = {
+    offsets = None
+    if settings.chunker_backend == "fast":
+        fast_chunks = split_text_fast(text)
+        chunks = [chunk for chunk, _, _ in fast_chunks]
+        offsets = [(start, end) for _, start, end in fast_chunks]
+    else:
+        chunks = split_text_into_chunks(text)
+    # IDs hash the nanosecond time so same-second re-uploads stay distinct;
+    # metadata keeps epoch seconds, much smaller than an ISO string per chunk
+    upload_ns = time.time_ns()
+    timestamp = upload_ns // 1_000_000_000
+
+    n_chunks = len(chunks)
+    chunk_ids = [create_document_id(filename, i, upload_ns) for i in range(n_chunks)]
+    metadatas: List[Dict[str, Any]] = [
+        {
             "filename": filename,
             "file_type": file_type,
             "chunk_index": i,
-            "total_chunks": len(chunks),
+            "total_chunks": n_chunks,
             "upload_timestamp": timestamp,
             "char_count": len(chunk),
         }
+        for i, chunk in enumerate(chunks)
+    ]
 
-        # Store original content in first chunk's metadata for editing
-        if i == 0:
-            metadata["original_content"] = text
+    if offsets is not None:
+        for metadata, (start, end) in zip(metadatas, offsets):
+            metadata["start_index"] = start
+            metadata["end_index"] = end
 
-        metadatas.append(metadata)
+    # Reference the original content (for editing) from the first chunk;
+    # inlining it would copy the whole document into ChromaDB metadata
+    if metadatas:
+        metadatas[0]["original_path"] = stage_original_content(filename, text)
 
     logger.info(
         f"Created {len(chunks)} chunks from {filename} "
@@ -196,17 +633,16 @@ def clean_text(text: str) -> str:
         Cleaned text
     """
     # Remove multiple spaces (but not newlines)
-    text = re.sub(r"[^\S\n]+", " ", text)
+    text = _WS_RUN.sub(" ", text)
 
     # Remove multiple newlines (more than 2)
-    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = _NL_RUN.sub("\n\n", text)
 
-    # Clean up lines: strip trailing spaces from each line
-    lines = text.split("\n")
-    lines = [line.strip() for line in lines]
-    text = "\n".join(lines)
+    # Clean up lines: strip spaces around every newline in one pass
+    text = _LINE_TRIM.sub("\n", text)
 
     # Strip leading/trailing whitespace
     text = text.strip()
 
     return text
+
@@ -0,0 +1,49 @@
+"""Entry points run in upload worker processes.
+
+Workers are spawned, so they import only this module and text_processing;
+ChromaDB, the embedding model and the routes stay in the server process.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Tuple, Union
+
+from text_processing import (
+    clean_text,
+    create_chunks_with_metadata,
+    extract_text_from_file,
+)
+
+
+def process_upload(
+    content: Union[str, Path],
+    filename: str,
+    file_type: str,
+) -> Tuple[List[str], List[str], List[Dict[str, Any]]]:
+    """
+    Extract, clean and chunk one document.
+
+    Doing every CPU-bound step in one call keeps the full text inside the
+    worker; only the chunks travel back.
+
+    Args:
+        content: Already extracted text, or the path of the uploaded file
+            (parsers read it as a file instead of loading it into memory)
+        filename: Source filename
+        file_type: File MIME type or extension
+
+    Returns:
+        Tuple of (chunk_ids, chunks, metadatas); empty when the text is blank
+    """
+    if isinstance(content, Path):
+        with open(content, "rb") as f:
+            content = extract_text_from_file(f, file_type, filename)
+    text = clean_text(content)
+
+    if not text.strip():
+        return [], [], []
+
+    return create_chunks_with_metadata(
+        text=text,
+        filename=filename,
+        file_type=file_type,
+    )
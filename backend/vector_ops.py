@@ -0,0 +1,78 @@
+"""Vector math helpers for post-retrieval reranking."""
+
+import logging
+from typing import List
+
+import numpy as np
+
+try:
+    import simsimd
+except ImportError:
+    # Fall back to NumPy kernels when SimSIMD wheels are unavailable
+    simsimd = None
+
+logger = logging.getLogger(__name__)
+
+
+def cosine_similarity_matrix(A: np.ndarray, B: np.ndarray) -> np.ndarray:
+    """
+    Compute pairwise cosine similarities between the rows of two matrices.
+
+    Args:
+        A: Matrix of shape (n, dim)
+        B: Matrix of shape (m, dim)
+
+    Returns:
+        Similarity matrix of shape (n, m)
+    """
+    A = np.ascontiguousarray(A, dtype=np.float32)
+    B = np.ascontiguousarray(B, dtype=np.float32)
+
+    if simsimd is not None:
+        return 1.0 - np.asarray(simsimd.cdist(A, B, metric="cosine"), dtype=np.float32)
+
+    A_norm = A / np.maximum(np.linalg.norm(A, axis=1, keepdims=True), 1e-12)
+    B_norm = B / np.maximum(np.linalg.norm(B, axis=1, keepdims=True), 1e-12)
+    return A_norm @ B_norm.T
+
+
+def mmr_select(
+    query_similarities: np.ndarray,
+    embeddings: np.ndarray,
+    k: int,
+    lambda_mult: float = 0.7,
+) -> List[int]:
+    """
+    Select diverse results with Maximal Marginal Relevance.
+
+    Each step picks the candidate maximizing
+    `lambda * sim(q, d) - (1 - lambda) * max_j sim(d, chosen_j)`.
+
+    Args:
+        query_similarities: Similarity of each candidate to the query
+        embeddings: Candidate embeddings of shape (n, dim)
+        k: Number of candidates to select
+        lambda_mult: Trade-off between relevance (1.0) and diversity (0.0)
+
+    Returns:
+        Indices of selected candidates in selection order
+    """
+    n = len(query_similarities)
+    k = min(k, n)
+    if k <= 0:
+        return []
+
+    query_similarities = np.asarray(query_similarities, dtype=np.float32)
+    pairwise = cosine_similarity_matrix(embeddings, embeddings)
+
+    selected = [int(np.argmax(query_similarities))]
+    max_redundancy = pairwise[selected[0]].copy()
+
+    while len(selected) < k:
+        scores = lambda_mult * query_similarities - (1.0 - lambda_mult) * max_redundancy
+        scores[selected] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        np.maximum(max_redundancy, pairwise[best], out=max_redundancy)
+
+    return selected
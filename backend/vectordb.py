@@ -1,15 +1,141 @@
 """ChromaDB vector database management."""
 
+import copy
+import hashlib
 import logging
 import os
-from typing import List, Dict, Any, Optional
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Union
 import chromadb
+import numpy as np
 from chromadb.config import Settings as ChromaSettings
 
 from config import settings
 
 logger = logging.getLogger(__name__)
 
+# Chunks per collection.add call, bounding memory and HNSW insert batches
+ADD_BATCH_SIZE = 256
+
+# Embeddings are unit-norm, so cosine space lets HNSW rank by inner product
+COLLECTION_METADATA = {
+    "description": "HR Evaluation documents collection",
+    "hnsw:space": "cosine",
+}
+
+
+def distance_space(collection) -> str:
+    """
+    Get the HNSW distance space of a collection.
+
+    Args:
+        collection: ChromaDB collection
+
+    Returns:
+        Space name ("l2" when not configured, ChromaDB's default)
+    """
+    return (collection.metadata or {}).get("hnsw:space", "l2")
+
+
+def distances_to_similarities(distances: Sequence[float], space: str) -> np.ndarray:
+    """
+    Convert ChromaDB distances to cosine similarities.
+
+    Args:
+        distances: Distances returned by a query
+        space: Distance space of the queried collection
+
+    Returns:
+        Array of cosine similarities
+    """
+    distances = np.asarray(distances, dtype=np.float32)
+    if space == "cosine":
+        return 1.0 - distances
+    # Collections created before cosine space: L2 on normalized vectors
+    return 1.0 - 0.5 * distances * distances
+
+
+def _query_cache_key(
+    query_embeddings: Sequence[np.ndarray],
+    n_results: int,
+    where: Optional[Dict[str, Any]],
+    include: Optional[List[str]],
+) -> bytes:
+    """Hash query arguments into a query result cache key."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.ascontiguousarray(query_embeddings, dtype=np.float32).tobytes())
+    h.update(repr((n_results, where, include)).encode())
+    return h.digest()
+
+
+def shard_names(name: str, n_shards: int) -> List[str]:
+    """
+    Get the collection names of a sharded collection.
+
+    The first shard keeps the unsharded name, so existing data stays in place.
+
+    Args:
+        name: Base collection name
+        n_shards: Number of shards
+
+    Returns:
+        Collection name of each shard
+    """
+    return [name] + [f"{name}_shard{i}" for i in range(1, n_shards)]
+
+
+def _merge_query_results(
+    results: List[Dict[str, Any]],
+    n_results: int,
+) -> Dict[str, Any]:
+    """
+    Merge per-shard query results into the n_results nearest per query.
+
+    Args:
+        results: Query results from each shard (all including distances)
+        n_results: Number of results to keep per query
+
+    Returns:
+        Query results in the shape of a single collection query
+    """
+    merged = dict(results[0])
+    fields = [k for k, v in merged.items() if k != "included" and v is not None]
+    for field in fields:
+        merged[field] = []
+
+    for q in range(len(results[0]["ids"])):
+        nearest = sorted(
+            (distance, s, j)
+            for s, r in enumerate(results)
+            for j, distance in enumerate(r["distances"][q])
+        )[:n_results]
+        for field in fields:
+            merged[field].append([results[s][field][q][j] for _, s, j in nearest])
+
+    return merged
+
+
+def _concat_get_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Concatenate per-shard get results.
+
+    Args:
+        results: Get results from each shard
+
+    Returns:
+        Get results in the shape of a single collection get
+    """
+    merged = dict(results[0])
+    for field, value in results[0].items():
+        if field != "included" and value is not None:
+            merged[field] = [item for r in results for item in r[field]]
+    return merged
+
 
 class VectorDB:
     """ChromaDB vector database wrapper."""
@@ -18,8 +144,119 @@ class VectorDB:
         """Initialize ChromaDB client."""
         self.client = None
         self.collection = None
+        # Collections sharing the documents by ID hash; shards[0] is collection
+        self.shards = []
+        self._shard_pool: Optional[ThreadPoolExecutor] = None
+        self.space = "cosine"
+        # LRU of (cached_at, results), cleared whenever the collection changes
+        self._query_cache: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._query_cache_lock = threading.Lock()
         self._initialize()
 
+    def _clear_query_cache(self) -> None:
+        """Drop cached query results after the collection changes."""
+        with self._query_cache_lock:
+            self._query_cache.clear()
+
+    def _open_shards(self, create: bool = False) -> None:
+        """
+        Get (or create) the shard collections.
+
+        Args:
+            create: Create the collections instead of getting existing ones
+        """
+        n_shards = max(settings.chroma_shards, 1)
+        if not create:
+            self._check_shard_count(n_shards)
+
+        # Embeddings are always supplied, so skip Chroma's default
+        # embedding function (and its ONNX model)
+        open_collection = (
+            self.client.create_collection if create
+            else self.client.get_or_create_collection
+        )
+        # The shard count is recorded so by-ID routing can be trusted later
+        metadata = {**COLLECTION_METADATA, "shards": n_shards}
+        self.shards = [
+            open_collection(
+                name=name,
+                metadata=metadata,
+                embedding_function=None,
+            )
+            for name in shard_names(settings.chroma_collection_name, n_shards)
+        ]
+        self.collection = self.shards[0]
+        self.space = distance_space(self.collection)
+
+    def _existing_shard_names(self) -> List[str]:
+        """Names of every stored shard collection, whatever the shard count."""
+        base = settings.chroma_collection_name
+        pattern = re.compile(rf"{re.escape(base)}(_shard\d+)?")
+        # list_collections returns collections before ChromaDB 0.6, names after
+        names = [getattr(c, "name", c) for c in self.client.list_collections()]
+        return [name for name in names if pattern.fullmatch(name)]
+
+    def _check_shard_count(self, n_shards: int) -> None:
+        """
+        Make sure stored documents were routed with the configured shard count.
+
+        Empty collections are dropped so they can be recreated with the new
+        count; otherwise a mismatch would make by-ID lookups miss silently.
+
+        Args:
+            n_shards: Configured number of shards
+
+        Raises:
+            RuntimeError: If non-empty collections use another shard count
+        """
+        existing = self._existing_shard_names()
+        if not existing:
+            return
+
+        base = settings.chroma_collection_name
+        stored = None
+        if base in existing:
+            metadata = self.client.get_collection(
+                name=base, embedding_function=None
+            ).metadata or {}
+            # Collections from before sharding were a single collection
+            stored = metadata.get("shards", 1)
+        if stored == n_shards and len(existing) == n_shards:
+            return
+
+        collections = [
+            self.client.get_collection(name=name, embedding_function=None)
+            for name in existing
+        ]
+        if any(collection.count() for collection in collections):
+            raise RuntimeError(
+                f"Collection '{base}' holds documents sharded {stored or len(existing)} "
+                f"way(s) but chroma_shards is {n_shards}; restore the setting, "
+                f"or reset the collection before changing it"
+            )
+
+        logger.info(f"Recreating empty collection '{base}' with {n_shards} shard(s)")
+        for name in existing:
+            self.client.delete_collection(name=name)
+
+    def _shard_of(self, doc_id: str) -> int:
+        """Index of the shard holding a document ID (stable across runs)."""
+        return zlib.crc32(doc_id.encode()) % len(self.shards)
+
+    def _group_by_shard(self, ids: Sequence[str]) -> List[List[int]]:
+        """Positions of the given IDs, grouped by the shard holding each."""
+        groups = [[] for _ in self.shards]
+        for i, doc_id in enumerate(ids):
+            groups[self._shard_of(doc_id)].append(i)
+        return groups
+
+    def _map_shards(self, fn, args_per_shard: List[tuple]) -> List[Any]:
+        """Call fn(*args) for each shard's args, in parallel when sharded."""
+        if len(args_per_shard) == 1:
+            return [fn(*args_per_shard[0])]
+        futures = [self._shard_pool.submit(fn, *args) for args in args_per_shard]
+        return [future.result() for future in futures]
+
     def _initialize(self):
         """Initialize ChromaDB client and collection."""
         try:
@@ -38,14 +275,24 @@ class VectorDB:
                 ),
             )
 
-            # Get or create collection
-            self.collection = self.client.get_or_create_collection(
-                name=settings.chroma_collection_name,
-                metadata={"description": "HR Evaluation documents collection"},
+            # Get or create collection (one per shard)
+            self._open_shards()
+            if len(self.shards) > 1:
+                self._shard_pool = ThreadPoolExecutor(
+                    max_workers=len(self.shards),
+                    thread_name_prefix="chroma-shard",
+                )
+            if self.space != "cosine":
+                logger.warning(
+                    f"Collection uses '{self.space}' distance; "
+                    f"reset it to switch to cosine space"
+                )
+
+            logger.info(
+                f"ChromaDB initialized: collection '{settings.chroma_collection_name}'"
+                f" ({len(self.shards)} shard(s))"
             )
 
-            logger.info(f"ChromaDB initialized: collection '{settings.chroma_collection_name}'")
-
         except Exception as e:
             logger.error(f"Failed to initialize ChromaDB: {e}")
             raise
@@ -54,7 +301,7 @@ class VectorDB:
         self,
         ids: List[str],
         documents: List[str],
-        embeddings: List[List[float]],
+        embeddings: Union[np.ndarray, Sequence[Sequence[float]]],
         metadatas: Optional[List[Dict[str, Any]]] = None,
     ) -> None:
         """
@@ -63,27 +310,70 @@ class VectorDB:
         Args:
             ids: List of unique document IDs
             documents: List of document texts
-            embeddings: List of embedding vectors
+            embeddings: Embedding vectors with shape (len(ids), dim), as an
+                array or nested lists (converted to one float32 block)
             metadatas: Optional list of metadata dictionaries
         """
-        try:
-            self.collection.add(
-                ids=ids,
-                documents=documents,
-                embeddings=embeddings,
-                metadatas=metadatas,
-            )
-            logger.info(f"Added {len(ids)} documents to collection")
+        # Batch slices may be views, and lists cost a PyFloat per value;
+        # hand Chroma contiguous float32 so each sub-batch is a cheap view
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
 
-        except Exception as e:
-            logger.error(f"Failed to add documents: {e}")
-            raise
+        try:
+            if len(self.shards) == 1:
+                self._add_batches(
+                    self.collection, ids, documents, embeddings, metadatas
+                )
+            else:
+                # Each shard has its own HNSW index, so shards insert in parallel
+                self._map_shards(self._add_batches, [
+                    (
+                        shard,
+                        [ids[i] for i in positions],
+                        [documents[i] for i in positions],
+                        embeddings[positions],
+                        [metadatas[i] for i in positions] if metadatas else None,
+                    )
+                    for shard, positions in zip(self.shards, self._group_by_shard(ids))
+                    if positions
+                ])
+        finally:
+            self._clear_query_cache()
+
+        logger.info(f"Added {len(ids)} documents to collection")
+
+    def _add_batches(
+        self,
+        collection,
+        ids: List[str],
+        documents: List[str],
+        embeddings: np.ndarray,
+        metadatas: Optional[List[Dict[str, Any]]],
+    ) -> None:
+        """Add documents to one collection in ADD_BATCH_SIZE sub-batches."""
+        for start in range(0, len(ids), ADD_BATCH_SIZE):
+            stop = start + ADD_BATCH_SIZE
+            try:
+                collection.add(
+                    ids=ids[start:stop],
+                    documents=documents[start:stop],
+                    embeddings=embeddings[start:stop],
+                    metadatas=metadatas[start:stop] if metadatas else None,
+                )
+            except Exception as e:
+                # Earlier sub-batches are committed; report where to resume
+                logger.error(
+                    f"Failed to add documents to '{collection.name}' at sub-batch "
+                    f"{start // ADD_BATCH_SIZE} "
+                    f"(items {start}-{min(stop, len(ids)) - 1}): {e}"
+                )
+                raise
 
     def query(
         self,
-        query_embeddings: List[List[float]],
+        query_embeddings: Sequence[np.ndarray],
         n_results: int = 3,
         where: Optional[Dict[str, Any]] = None,
+        include: Optional[List[str]] = None,
     ) -> Dict[str, Any]:
         """
         Query the collection for similar documents.
@@ -92,35 +382,96 @@ class VectorDB:
             query_embeddings: Query embedding vectors
             n_results: Number of results to return
             where: Optional metadata filter
+            include: Optional fields to return (e.g., ["embeddings", "documents"])
 
         Returns:
             Query results with ids, documents, metadatas, and distances
         """
+        # Invalidation is per process, so other uvicorn workers' writes would
+        # go unnoticed; the TTL bounds staleness from any other writer
+        cache_size = settings.query_cache_size if settings.backend_workers == 1 else 0
+        if cache_size > 0:
+            key = _query_cache_key(query_embeddings, n_results, where, include)
+            now = time.monotonic()
+            cached = None
+            with self._query_cache_lock:
+                entry = self._query_cache.get(key)
+                if entry is not None:
+                    if now - entry[0] < settings.query_cache_ttl:
+                        cached = entry[1]
+                        self._query_cache.move_to_end(key)
+                    else:
+                        del self._query_cache[key]
+            if cached is not None:
+                # Callers may mutate results, so hand out a copy
+                return copy.deepcopy(cached)
+
         try:
-            results = self.collection.query(
-                query_embeddings=query_embeddings,
-                n_results=n_results,
-                where=where,
-            )
+            kwargs = {}
+            if include is not None:
+                kwargs["include"] = include
+
+            if len(self.shards) == 1:
+                results = self.collection.query(
+                    query_embeddings=query_embeddings,
+                    n_results=n_results,
+                    where=where,
+                    **kwargs,
+                )
+            else:
+                # Merging shards ranks by distance, so always fetch it
+                if include is not None and "distances" not in include:
+                    kwargs["include"] = [*include, "distances"]
+                results = _merge_query_results(
+                    self._map_shards(
+                        lambda shard: shard.query(
+                            query_embeddings=query_embeddings,
+                            n_results=n_results,
+                            where=where,
+                            **kwargs,
+                        ),
+                        [(shard,) for shard in self.shards],
+                    ),
+                    n_results,
+                )
+                if include is not None and "distances" not in include:
+                    results["distances"] = None
             logger.info(f"Query returned {len(results['ids'][0])} results")
-            return results
 
         except Exception as e:
             logger.error(f"Failed to query collection: {e}")
             raise
 
-    def get_all_documents(self, where: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        if cache_size > 0:
+            with self._query_cache_lock:
+                self._query_cache[key] = (now, copy.deepcopy(results))
+                while len(self._query_cache) > cache_size:
+                    self._query_cache.popitem(last=False)
+        return results
+
+    def get_all_documents(
+        self,
+        where: Optional[Dict[str, Any]] = None,
+        include: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
         """
         Get all documents from the collection.
 
         Args:
             where: Optional metadata filter (e.g., {"category": "evaluation"})
+            include: Optional fields to return (e.g., ["metadatas"] to skip texts)
 
         Returns:
             All documents with their metadata
         """
         try:
-            results = self.collection.get(where=where)
+            kwargs = {}
+            if include is not None:
+                kwargs["include"] = include
+
+            results = _concat_get_results([
+                shard.get(where=where, **kwargs) for shard in self.shards
+            ])
             logger.info(f"Retrieved {len(results['ids'])} documents")
             return results
 
@@ -128,6 +479,39 @@ class VectorDB:
             logger.error(f"Failed to get documents: {e}")
             raise
 
+    def get_documents(
+        self,
+        ids: List[str],
+        include: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Get documents by ID.
+
+        Args:
+            ids: List of document IDs
+            include: Optional fields to return
+
+        Returns:
+            Matching documents with their metadata
+        """
+        try:
+            kwargs = {}
+            if include is not None:
+                kwargs["include"] = include
+
+            if len(self.shards) == 1 or not ids:
+                return self.collection.get(ids=ids, **kwargs)
+
+            return _concat_get_results([
+                shard.get(ids=[ids[i] for i in positions], **kwargs)
+                for shard, positions in zip(self.shards, self._group_by_shard(ids))
+                if positions
+            ])
+
+        except Exception as e:
+            logger.error(f"Failed to get documents by ID: {e}")
+            raise
+
     def delete_documents(self, ids: List[str]) -> None:
         """
         Delete documents from the collection.
@@ -136,7 +520,10 @@ class VectorDB:
             ids: List of document IDs to delete
         """
         try:
-            self.collection.delete(ids=ids)
+            for shard, positions in zip(self.shards, self._group_by_shard(ids)):
+                if positions:
+                    shard.delete(ids=[ids[i] for i in positions])
+            self._clear_query_cache()
             logger.info(f"Deleted {len(ids)} documents from collection")
 
         except Exception as e:
@@ -154,24 +541,39 @@ class VectorDB:
             Number of documents deleted
         """
         try:
-            # Get all documents with this filename
-            results = self.collection.get(
-                where={"filename": filename}
-            )
-
-            if results['ids']:
-                self.collection.delete(ids=results['ids'])
-                count = len(results['ids'])
-                logger.info(f"Deleted {count} chunks for file: {filename}")
-                return count
-            else:
+            where = {"filename": filename}
+
+            # Count via ids only, then let ChromaDB delete by the same filter
+            count = 0
+            for shard in self.shards:
+                shard_count = len(shard.get(where=where, include=[])["ids"])
+                if shard_count:
+                    shard.delete(where=where)
+                    count += shard_count
+            if count == 0:
                 logger.info(f"No documents found for file: {filename}")
                 return 0
 
+            self._clear_query_cache()
+            logger.info(f"Deleted {count} chunks for file: {filename}")
+            return count
+
         except Exception as e:
             logger.error(f"Failed to delete by filename: {e}")
             raise
 
+    def similarities(self, distances: Sequence[float]) -> np.ndarray:
+        """
+        Convert query distances from this collection to cosine similarities.
+
+        Args:
+            distances: Distances returned by query()
+
+        Returns:
+            Array of cosine similarities
+        """
+        return distances_to_similarities(distances, self.space)
+
     def count(self) -> int:
         """
         Count total documents in the collection.
@@ -180,7 +582,7 @@ class VectorDB:
             Number of documents
         """
         try:
-            return self.collection.count()
+            return sum(shard.count() for shard in self.shards)
         except Exception as e:
             logger.error(f"Failed to count documents: {e}")
             raise
@@ -188,11 +590,11 @@ class VectorDB:
     def reset(self) -> None:
         """Reset the collection (delete all documents)."""
         try:
-            self.client.delete_collection(name=settings.chroma_collection_name)
-            self.collection = self.client.create_collection(
-                name=settings.chroma_collection_name,
-                metadata={"description": "HR Evaluation documents collection"},
-            )
+            # Includes shards left over from an earlier shard count
+            for name in self._existing_shard_names():
+                self.client.delete_collection(name=name)
+            self._open_shards(create=True)
+            self._clear_query_cache()
             logger.info(f"Reset collection: '{settings.chroma_collection_name}'")
 
         except Exception as e: